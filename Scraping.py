@@ -3,12 +3,38 @@ import requests
 import random
 import time
 import os
-import csv
-from datetime import datetime as dt
-from bs4 import BeautifulSoup
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime as dt, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+import storage
+from categories import NDTV_HOST, get_category
+from extraction import extract_article, extract_links
+from http_cache import HTTP_CACHE
+from metrics import (ARTICLES_SCRAPED, HOST_RATE, HTTP_ERRORS, HTTP_LATENCY, HTTP_REQUESTS, HTTP_RETRIES, HTTP_THROTTLED,
+                     ROWS_WRITTEN, SCRAPE_FAILURES, SCRAPE_STAGE)
+
+# ---------------------------
+# Fetch engine settings (override via env)
+# ---------------------------
+SCRAPER_WORKERS = int(os.environ.get("SCRAPER_WORKERS", "8"))
+HOST_MAX_CONCURRENCY = int(os.environ.get("SCRAPER_HOST_CONCURRENCY", "4"))
+# starting spacing between requests to one host; the limiter adapts from there
+HOST_MIN_INTERVAL = float(os.environ.get("SCRAPER_HOST_INTERVAL", "0.25"))
+# requests per second a host is allowed to reach / never slowed below
+HOST_MAX_RATE = float(os.environ.get("SCRAPER_HOST_MAX_RATE", "8"))
+HOST_MIN_RATE = float(os.environ.get("SCRAPER_HOST_MIN_RATE", "0.2"))
+# a host answering slower than this (smoothed) is backed off
+HOST_TARGET_LATENCY = float(os.environ.get("SCRAPER_TARGET_LATENCY", "2.0"))
+# 429 / 503 answers are retried through the limiter (after Retry-After) this many times
+THROTTLE_RETRIES = int(os.environ.get("SCRAPER_THROTTLE_RETRIES", "3"))
+MAX_RETRY_AFTER = 300.0
+
 # ---------------------------
 # Helpers & Session
 # ---------------------------
@@ -26,15 +52,28 @@ def create_session():
     }
     s = requests.Session()
     s.headers.update(headers)
-    retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
-    adapter = HTTPAdapter(max_retries=retries)
+    # 429 / 503 are left to polite_get, which slows the whole host down instead of one thread
+    retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 504], raise_on_status=False,
+                    respect_retry_after_header=False)
+    # pool sized so every fetch worker can hold its own connection
+    adapter = HTTPAdapter(max_retries=retries, pool_connections=SCRAPER_WORKERS, pool_maxsize=SCRAPER_WORKERS)
     s.mount("https://", adapter)
     s.mount("http://", adapter)
     return s
 
-SESSION = create_session()
+# Created on first use, so importing this module does no network or disk setup
+_session = None
+_session_lock = threading.Lock()
 
-def make_full(href):
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+def make_full(href, host=NDTV_HOST):
     if not href:
         return None
     href = href.strip()
@@ -43,574 +82,313 @@ def make_full(href):
     if href.startswith("//"):
         return "https:" + href
     if href.startswith("/"):
-        return "https://www.ndtv.com" + href
-    return "https://www.ndtv.com/" + href
+        return host + href
+    return host + "/" + href
 
 # ---------------------------
-# CSV helpers (kept logic same)
+# Concurrent fetch engine (shared by all category scrapers)
 # ---------------------------
-def get_existing_links(filename):
-    existing_links = set()
-    if os.path.exists(filename):
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
         try:
-            with open(filename, "r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    # protect against missing 'link' column
-                    if "link" in row:
-                        existing_links.add(row["link"])
-        except Exception as e:
-            print(f"[get_existing_links] error reading {filename}: {e}")
-    return existing_links
-
-def save_to_csv(data, filename):
-    if not data:
-        print("No new articles to save.")
-        return
-    fieldnames = ["link", "headline", "datetime_posted", "content", "scraped_at", "analysis_result"]
-    file_exists = os.path.exists(filename)
-    try:
-        with open(filename, "a", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            if not file_exists:
-                writer.writeheader()
-            for row in data:
-                if "analysis_result" not in row:
-                    row["analysis_result"] = ""
-                writer.writerow(row)
-        print(f"Saved {len(data)} new articles to {filename}")
-    except Exception as e:
-        print(f"Error writing to CSV: {e}")
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = when.timestamp() - (time.time() if now is None else now)
+    return min(max(0.0, seconds), MAX_RETRY_AFTER)
+
+
+class HostBucket:
+    """Token bucket for one host whose refill rate follows the host's responses (AIMD):
+    +ADDITIVE_STEP req/s per healthy response, x DECREASE on 429/503, x SLOW_DECREASE on 5xx or rising latency."""
+
+    ADDITIVE_STEP = 0.1
+    DECREASE = 0.5
+    SLOW_DECREASE = 0.9
+    BURST = 2.0
+
+    def __init__(self, rate, min_rate, max_rate, target_latency, max_concurrency):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.rate = min(max(rate, self.min_rate), max_rate)
+        self.target_latency = target_latency
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.tokens = self.BURST
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.latency = None
+
+    def reserve(self):
+        """Take a token and return the monotonic time the request may start."""
+        with self.lock:
+            now = time.monotonic()
+            # while the host has us blocked, `updated` is the end of the block and nothing refills before it
+            if now > self.updated:
+                self.tokens = min(self.BURST, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+            # tokens may go negative: later callers queue up behind earlier reservations
+            self.tokens -= 1
+            return self.updated if self.tokens >= 0 else self.updated - self.tokens / self.rate
+
+    def feedback(self, status, latency, retry_after=None):
+        with self.lock:
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if status in (429, 503):
+                now = time.monotonic()
+                # requests already in flight when the host pushed back don't cut the rate again
+                if now >= self.blocked_until:
+                    self.rate = max(self.min_rate, self.rate * self.DECREASE)
+                # nothing else goes to this host until the server says so (or one slow interval)
+                pause = retry_after if retry_after is not None else 1.0 / self.rate
+                self.blocked_until = max(self.blocked_until, now + pause)
+                # pace from the end of the block at the reduced rate: one request then, the rest spaced out
+                self.updated = max(self.updated, self.blocked_until)
+                self.tokens = min(self.tokens, 1.0)
+            elif status >= 500 or self.latency > self.target_latency:
+                self.rate = max(self.min_rate, self.rate * self.SLOW_DECREASE)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.ADDITIVE_STEP)
+            return self.rate
+
+
+class AdaptiveHostLimiter:
+    """Per-host politeness shared by every fetch thread: caps in-flight requests and paces
+    request starts with a token bucket that speeds up while the host answers quickly and
+    backs off on 429/503 (honoring Retry-After), errors and rising latency."""
+
+    def __init__(self, max_concurrency=HOST_MAX_CONCURRENCY, min_interval=HOST_MIN_INTERVAL,
+                 min_rate=HOST_MIN_RATE, max_rate=HOST_MAX_RATE, target_latency=HOST_TARGET_LATENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        self.initial_rate = 1.0 / min_interval if min_interval > 0 else max_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def bucket(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostBucket(self.initial_rate, self.min_rate, self.max_rate,
+                                               self.target_latency, self.max_concurrency)
+            return self._hosts[host]
+
+    @contextmanager
+    def acquire(self, host):
+        bucket = self.bucket(host)
+        with bucket.semaphore:
+            start = bucket.reserve()
+            delay = start - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            yield
+
+    def feedback(self, host, status, latency, retry_after=None):
+        rate = self.bucket(host).feedback(status, latency, retry_after)
+        HOST_RATE.set(round(rate, 3), host=host)
+        return rate
+
+    def rates(self):
+        with self._lock:
+            return {host: bucket.rate for host, bucket in self._hosts.items()}
+
+
+HOST_LIMITER = AdaptiveHostLimiter()
+
+def record_response(host, response, seconds):
+    HTTP_LATENCY.observe(seconds, host=host)
+    HTTP_REQUESTS.inc(host=host, status=response.status_code)
+    # urllib3 keeps the attempts the Retry adapter made before this response
+    retries = getattr(response.raw, "retries", None)
+    for attempt in getattr(retries, "history", ()):
+        HTTP_RETRIES.inc(host=host, status=attempt.status or "error")
+
+def polite_get(url, timeout=15, headers=None):
+    host = urlparse(url).netloc
+    for attempt in range(THROTTLE_RETRIES + 1):
+        with HOST_LIMITER.acquire(host):
+            started = time.perf_counter()
+            try:
+                response = get_session().get(url, timeout=timeout, headers=headers)
+            except requests.RequestException:
+                HTTP_ERRORS.inc(host=host)
+                HOST_LIMITER.feedback(host, 599, time.perf_counter() - started)
+                raise
+        seconds = time.perf_counter() - started
+        record_response(host, response, seconds)
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        HOST_LIMITER.feedback(host, response.status_code, seconds, retry_after)
+        if response.status_code not in (429, 503) or attempt == THROTTLE_RETRIES:
+            return response
+        # the limiter now holds the host back until Retry-After; the next attempt waits for it
+        HTTP_THROTTLED.inc(host=host)
+        response.close()
+    return response
+
+def fetch_page(url, cache=HTTP_CACHE):
+    """Conditional GET through the on-disk response cache.
+
+    Returns (content, changed); changed is False on a 304 or when the body hashes the same as last time.
+    """
+    if cache is None:
+        response = polite_get(url)
+        response.raise_for_status()
+        return response.content, True
+    cached = cache.get(url)
+    response = polite_get(url, headers=cache.conditional_headers(cached))
+    if response.status_code == 304 and cached is not None:
+        cache.touch(url)
+        return cached.content, False
+    response.raise_for_status()
+    return response.content, cache.store(url, response, cached)
+
+def fetch_concurrently(links, scrape_one, workers=None):
+    """Run scrape_one(link) over links on a bounded thread pool.
+
+    Rows come back in the order of links; links whose scraper returns None are dropped.
+    """
+    if not links:
+        return []
+    workers = max(1, min(workers or SCRAPER_WORKERS, len(links)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(scrape_one, links))
+    return [row for row in results if row is not None]
 
 # ---------------------------
-# Category list fetchers (use session + debug dumps)
+# Article store helpers
 # ---------------------------
+class LinkIndex:
+    """Process-wide seen-URL sets, one per category.
 
-def getgeneralndtv():
-    URL = "https://www.ndtv.com/latest"
-    try:
-        time.sleep(random.uniform(0.8, 1.6))
-        resp = SESSION.get(URL, timeout=15)
-    except requests.RequestException as e:
-        print(f"[getgeneralndtv] request failed: {e}")
-        return []
+    Each category's links are loaded from the store once on first use;
+    save_articles() adds new links, so membership checks never hit the database again.
+    """
 
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._links = {}
 
+    def _links_for(self, category):
+        with self._lock:
+            if category not in self._links:
+                self._links[category] = storage.get_links(category)
+            return self._links[category]
 
-    soup = BeautifulSoup(resp.content, "html.parser")
-    generalndtv_list = []
+    def new_links(self, category, links):
+        seen = self._links_for(category)
+        return [link for link in links if link not in seen]
 
-    articles = soup.find_all("div", class_="NwsLstPg_txt-wrp")
-    if articles:
-        for article in articles:
-            h2_tag = article.find("h2", class_="NwsLstPg_ttl")
-            a_tag = h2_tag.find("a") if h2_tag else None
-            if a_tag and a_tag.get("href"):
-                generalndtv_list.append(make_full(a_tag["href"]))
-    else:
-        # fallback: harvest h2 anchors and reasonable anchors
-        for h2 in soup.find_all("h2"):
-            a = h2.find("a", href=True)
-            if a:
-                generalndtv_list.append(make_full(a["href"]))
-        if not generalndtv_list:
-            for a in soup.select("a[href]"):
-                href = a["href"]
-                text = a.get_text(strip=True)
-                if text and any(x in href for x in ["/news/", "/latest", "/india-news/", "/world-news/"]):
-                    generalndtv_list.append(make_full(href))
-
-    # dedupe
-    cleaned = []
-    seen = set()
-    for u in generalndtv_list:
-        if not u:
-            continue
-        if u in seen:
-            continue
-        seen.add(u)
-        cleaned.append(u)
-
-    print(f"[getgeneralndtv] returning {len(cleaned)} links (sample 5): {cleaned[:5]}")
-    return cleaned
-
-def getedundtv():
-    URL = "https://www.ndtv.com/education"
-    try:
-        time.sleep(random.uniform(0.8, 1.6))
-        resp = SESSION.get(URL, timeout=15)
-    except requests.RequestException as e:
-        print(f"[getedundtv] request failed: {e}")
-        return []
+    def add(self, category, links):
+        seen = self._links_for(category)
+        with self._lock:
+            seen.update(links)
 
-    soup = BeautifulSoup(resp.content, "html.parser")
-    edundtv_list = []
-    articles = soup.find_all("a", class_="crd_lnk")
-    for article in articles:
-        link = article.get("href")
-        if link:
-            edundtv_list.append(make_full(link))
-    print(f"[getedundtv] returning {len(edundtv_list)} links")
-    return list(dict.fromkeys(edundtv_list))
-
-def gethealthndtv():
-    URL = "https://doctor.ndtv.com/top-stories"
-    try:
-        time.sleep(random.uniform(0.8, 1.6))
-        resp = SESSION.get(URL, timeout=15)
-    except requests.RequestException as e:
-        print(f"[gethealthndtv] request failed: {e}")
-        return []
 
-    soup = BeautifulSoup(resp.content, "html.parser")
-    healthndtv_list = []
-    articles = soup.find_all("div", class_="stry-cont")
-    for article in articles:
-        a_tag = article.find("a", href=True)
-        if a_tag:
-            link = a_tag["href"]
-            if link.startswith("/"):
-                link = "https://doctor.ndtv.com" + link
-            healthndtv_list.append(link)
-    print(f"[gethealthndtv] returning {len(healthndtv_list)} links")
-    return list(dict.fromkeys(healthndtv_list))
-
-def getcricketndtv():
-    URL = "https://sports.ndtv.com/cricket"
-    try:
-        time.sleep(random.uniform(0.8, 1.6))
-        resp = SESSION.get(URL, timeout=15)
-    except requests.RequestException as e:
-        print(f"[getcricketndtv] request failed: {e}")
-        return []
+LINK_INDEX = LinkIndex()
 
-    soup = BeautifulSoup(resp.content, "html.parser")
-    cricketndtv_list = []
-    articles = soup.find_all("div", class_="crd_txt-wrp")
-    for article in articles:
-        h3_tag = article.find("h3", class_="crd_ttl")
-        a_tag = h3_tag.find("a", class_="crd_lnk") if h3_tag else None
-        if a_tag and a_tag.get("href"):
-            link = a_tag["href"]
-            if link.startswith("/"):
-                link = "https://sports.ndtv.com" + link
-            cricketndtv_list.append(link)
-    print(f"[getcricketndtv] returning {len(cricketndtv_list)} links")
-    return list(dict.fromkeys(cricketndtv_list))
-
-def getsciencendtv():
-    URL = "https://www.ndtv.com/science"
+def save_articles(data, category):
+    data = [row for row in (storage.normalize_row(category, row) for row in data or []) if row is not None]
+    if not data:
+        print("No new articles to save.")
+        return
     try:
-        time.sleep(random.uniform(0.8, 1.6))
-        resp = SESSION.get(URL, timeout=15)
-    except requests.RequestException as e:
-        print(f"[getsciencendtv] request failed: {e}")
-        return []
+        with SCRAPE_STAGE.time(category=category, stage="store"):
+            inserted = storage.insert_articles(category, data)
+        ROWS_WRITTEN.inc(inserted, category=category)
+        LINK_INDEX.add(category, (row["link"] for row in data))
+        print(f"Saved {inserted} new {category} articles")
+    except Exception as e:
+        print(f"Error writing {category} articles to the store: {e}")
 
-    soup = BeautifulSoup(resp.content, "html.parser")
-    sciencendtv_list = []
-    articles = soup.find_all("div", class_="NwsLstPg_txt-wrp")
-    for article in articles:
-        h2_tag = article.find("h2", class_="NwsLstPg_ttl")
-        a_tag = h2_tag.find("a") if h2_tag else None
-        if a_tag and a_tag.get("href"):
-            link = a_tag["href"]
-            if link.startswith("/"):
-                link = "https://www.ndtv.com" + link
-            sciencendtv_list.append(link)
-    print(f"[getsciencendtv] returning {len(sciencendtv_list)} links")
-    return list(dict.fromkeys(sciencendtv_list))
-
-def getworldndtv():
-    URL = "https://www.ndtv.com/world"
-    try:
-        time.sleep(random.uniform(0.8, 1.6))
-        resp = SESSION.get(URL, timeout=15)
-    except requests.RequestException as e:
-        print(f"[getworldndtv] request failed: {e}")
-        return []
+# ---------------------------
+# Generic crawl: listing page -> link extraction -> fetch -> extract -> persist,
+# driven by the section's entry in categories.CATEGORY_REGISTRY
+# ---------------------------
+# listing URL -> links parsed from its last fetched body
+LISTING_LINKS = {}
 
-    soup = BeautifulSoup(resp.content, "html.parser")
-    worldndtv_list = []
-    articles = soup.find_all("div", class_="crd_txt-wrp")
-    for article in articles:
-        h3_tag = article.find("h3", class_="crd_ttl8")
-        if not h3_tag:
-            continue
-        a_tag = h3_tag.find("a", href=True)
-        if a_tag:
-            link = a_tag["href"].strip()
-            worldndtv_list.append(make_full(link))
-    print(f"[getworldndtv] returning {len(worldndtv_list)} links")
-    return list(dict.fromkeys(worldndtv_list))
-
-def getenterndtv():
-    URL = "https://www.ndtv.com/entertainment/latest"
+def fetch_listing(category):
+    config = get_category(category)
     try:
-        time.sleep(random.uniform(0.8, 1.6))
-        resp = SESSION.get(URL, timeout=15)
+        with SCRAPE_STAGE.time(category=category, stage="listing_fetch"):
+            content, changed = fetch_page(config["url"])
     except requests.RequestException as e:
-        print(f"[getenterndtv] request failed: {e}")
+        SCRAPE_FAILURES.inc(category=category, kind="listing")
+        print(f"[{category}] listing request failed: {e}")
         return []
+    if not changed and config["url"] in LISTING_LINKS:
+        # same page as last time: reuse its links instead of parsing it again
+        links = LISTING_LINKS[config["url"]]
+        print(f"[{category}] listing unchanged, reusing {len(links)} links")
+        return links
+
+    with SCRAPE_STAGE.time(category=category, stage="listing_parse"):
+        links = [make_full(href, config["host"]) for href in extract_links(config["listing"], content)]
+    # dedupe, keeping page order
+    links = list(dict.fromkeys(link for link in links if link))
+    LISTING_LINKS[config["url"]] = links
+    print(f"[{category}] returning {len(links)} links (sample 5): {links[:5]}")
+    return links
+
+def scrape_article(category, link):
+    try:
+        # article pages are parsed even when unchanged: the same story can be new to another section
+        with SCRAPE_STAGE.time(category=category, stage="article_fetch"):
+            content, _ = fetch_page(link)
+        row = {"link": link}
+        with SCRAPE_STAGE.time(category=category, stage="article_parse"):
+            row.update(extract_article(get_category(category)["article"], content))
+        row["scraped_at"] = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+        ARTICLES_SCRAPED.inc(category=category)
+        return row
+    except Exception as e:
+        SCRAPE_FAILURES.inc(category=category, kind="article")
+        print(f"Error scraping {link}: {e}")
+        return None
 
-    soup = BeautifulSoup(resp.content, "html.parser")
-    enterndtv_list = []
-    articles = soup.find_all("div", class_="NwsLstPg_txt-wrp")
-    for article in articles:
-        h2_tag = article.find("h2", class_="NwsLstPg_ttl")
-        a_tag = h2_tag.find("a", class_="NwsLstPg_ttl-lnk") if h2_tag else None
-        if a_tag and a_tag.get("href"):
-            link = a_tag["href"]
-            if link.startswith("/"):
-                link = "https://www.ndtv.com" + link
-            enterndtv_list.append(link)
-    print(f"[getenterndtv] returning {len(enterndtv_list)} links")
-    return list(dict.fromkeys(enterndtv_list))
-
-# ---------------------------
-# Article scrapers (kept your logic, use SESSION & dedupe)
-# ---------------------------
-
-FILENAME = "ndtv_general_news.csv"
-
-def getgeneralarticlendtv():
-    links = getgeneralndtv()
-    scraped_data = []
-    existing_links = get_existing_links(FILENAME)
-
-    for link in links:
-        if link in existing_links:
-            continue
-        try:
-            time.sleep(random.uniform(0.6, 1.2))
-            res = SESSION.get(link, timeout=15)
-            soup = BeautifulSoup(res.content, "html.parser")
-
-            headline_tag = soup.find("h1", class_="sp-ttl")
-            headline = headline_tag.get_text(strip=True) if headline_tag else None
-
-            date_tag = soup.find("span", class_="pst-by_lnk")
-            datetime_posted = date_tag.get_text(strip=True) if date_tag else None
+def mark_seen(category, links):
+    LINK_INDEX.add(category, links)
 
-            content_div = soup.find("div", id="ignorediv")
-            if content_div:
-                paragraphs = content_div.find_all("p")
-                content = " ".join(p.get_text(strip=True) for p in paragraphs)
-            else:
-                # fallback: gather all <p> inside article area
-                paragraphs = soup.find_all("p")
-                content = " ".join(p.get_text(strip=True) for p in paragraphs) if paragraphs else None
-
-            scraped_data.append({
-                "link": link,
-                "headline": headline,
-                "datetime_posted": datetime_posted,
-                "content": content,
-                "scraped_at": dt.now().strftime("%Y-%m-%d %H:%M:%S"),
-            })
-        except Exception as e:
-            print(f"Error scraping {link}: {e}")
-
-    save_to_csv(scraped_data, FILENAME)
-    return scraped_data
-
-# Education
-def geteduarticlendtv():
-    FILENAME = "ndtv_education_news.csv"
-    links = getedundtv()
-    scraped_data = []
-    existing_links = get_existing_links(FILENAME)
-
-    for link in links:
-        if link in existing_links:
-            continue
-        try:
-            time.sleep(random.uniform(0.6, 1.2))
-            response = SESSION.get(link, timeout=15)
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            headline_tag = soup.find("h1", class_="sp-ttl", itemprop="headline")
-            headline = headline_tag.get_text(strip=True) if headline_tag else "No headline"
-
-            datetime_tag = soup.find("span", class_="pst-by_lnk", itemprop="dateModified")
-            datetime_text = datetime_tag.get_text(strip=True) if datetime_tag else "No date/time"
-
-            article_section = soup.find("div", class_="Art-exp_wr", id="ignorediv")
-            paragraphs = article_section.find_all("p") if article_section else []
-            article_text = "\n".join(p.get_text(strip=True) for p in paragraphs)
-
-            scraped_data.append({
-                "link": link,
-                "headline": headline,
-                "datetime_posted": datetime_text,
-                "content": article_text,
-                "scraped_at": dt.now().strftime("%Y-%m-%d %H:%M:%S"),
-            })
-        except Exception as e:
-            print(f"Error processing {link}: {e}")
-
-    save_to_csv(scraped_data, FILENAME)
-    return scraped_data
-
-# Health
-def gethealtharticlendtv():
-    FILENAME = "ndtv_health_news.csv"
-    links = gethealthndtv()
-    scraped_data = []
-    existing_links = get_existing_links(FILENAME)
-
-    for link in links:
-        if link in existing_links:
-            continue
-        try:
-            time.sleep(random.uniform(0.6, 1.2))
-            response = SESSION.get(link, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            headline_tag = soup.find("div", class_="__sslide")
-            headline = headline_tag.find("h1").text.strip() if headline_tag else "No headline found"
-
-            datetime_tag = soup.find("div", class_="article-author tpStl1")
-            datetime_text = datetime_tag.find("span").text.strip() if datetime_tag else "No datetime found"
-
-            content_div = soup.find("div", class_="article_storybody")
-            paragraphs = content_div.find_all("p") if content_div else []
-            article_text = " ".join(p.text.strip() for p in paragraphs)
-
-            scraped_data.append({
-                "link": link,
-                "headline": headline,
-                "datetime_posted": datetime_text,
-                "content": article_text,
-                "scraped_at": dt.now().strftime("%Y-%m-%d %H:%M:%S"),
-            })
-        except Exception as e:
-            print(f"Error processing {link}: {e}")
-
-    save_to_csv(scraped_data, FILENAME)
-    return scraped_data
-
-# Cricket
-def getcricketarticlendtv():
-    FILENAME = "ndtv_cricket_news.csv"
-    links = getcricketndtv()
-    scraped_data = []
-    existing_links = get_existing_links(FILENAME)
-
-    for link in links:
-        if link in existing_links:
-            continue
-        try:
-            time.sleep(random.uniform(0.6, 1.2))
-            response = SESSION.get(link, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            headline_tag = soup.find("h2", class_="sp-descp")
-            headline = headline_tag.get_text(strip=True) if headline_tag else "No headline found"
-
-            datetime_text = "No date/time found"
-            meta_tag = soup.find("meta", {"itemprop": "datePublished"})
-            if meta_tag and "content" in meta_tag.attrs:
-                datetime_text = meta_tag["content"].replace("T", " ").replace("+05:30", "")
-
-            article_section = soup.find("div", class_="story__content")
-            paragraphs = article_section.find_all("p") if article_section else []
-            article_text = "\n".join(p.get_text(strip=True) for p in paragraphs)
-
-            scraped_data.append({
-                "link": link,
-                "headline": headline,
-                "datetime_posted": datetime_text,
-                "content": article_text,
-                "scraped_at": dt.now().strftime("%Y-%m-%d %H:%M:%S"),
-            })
-        except Exception as e:
-            print(f"Error processing {link}: {e}")
-
-    save_to_csv(scraped_data, FILENAME)
-    return scraped_data
-
-# Science
-def getsciencearticlendtv():
-    FILENAME = "ndtv_science_news.csv"
-    links = getsciencendtv()
-    scraped_data = []
-
-    for link in links:
-        # dedupe check
-        existing_links = get_existing_links(FILENAME)
-        if link in existing_links:
-            continue
-        try:
-            time.sleep(random.uniform(0.6, 1.2))
-            response = SESSION.get(link, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            headline_tag = soup.find("h1", class_="sp-ttl", itemprop="headline")
-            headline = headline_tag.get_text(strip=True) if headline_tag else "No headline found"
-
-            datetime_tag = soup.find("span", class_="pst-by_lnk", itemprop="dateModified")
-            if datetime_tag and datetime_tag.has_attr("content"):
-                datetime_text = datetime_tag["content"]
-            elif datetime_tag:
-                datetime_text = datetime_tag.get_text(strip=True)
-            else:
-                datetime_text = "No date/time found"
-
-            paragraphs = soup.find_all("p")
-            article_text = "\n".join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
-
-            scraped_data.append({
-                "link": link,
-                "headline": headline,
-                "datetime_posted": datetime_text,
-                "content": article_text,
-                "scraped_at": dt.now().strftime("%Y-%m-%d %H:%M:%S"),
-            })
-        except Exception as e:
-            print(f"Error processing {link}: {e}")
-
-    save_to_csv(scraped_data, FILENAME)
-    return scraped_data
-
-# World
-def getworldarticlendtv():
-    FILENAME = "ndtv_world_news.csv"
-    links = getworldndtv()
-    scraped_data = []
-
-    for link in links:
-        existing_links = get_existing_links(FILENAME)
-        if link in existing_links:
-            continue
-        try:
-            time.sleep(random.uniform(0.6, 1.2))
-            response = SESSION.get(link, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            headline_tag = soup.find("h1", class_="sp-ttl", itemprop="headline")
-            headline = headline_tag.get_text(strip=True) if headline_tag else "No headline found"
-
-            datetime_tag = soup.find("span", class_="pst-by_lnk", itemprop="dateModified")
-            if datetime_tag and datetime_tag.has_attr("content"):
-                datetime_text = datetime_tag["content"]
-            elif datetime_tag:
-                datetime_text = datetime_tag.get_text(strip=True)
-            else:
-                datetime_text = "No date/time found"
-
-            ai_summary_tag = soup.find("div", class_="AiSum_tx")
-            ai_summary = ai_summary_tag.get_text(strip=True) if ai_summary_tag else ""
-
-            paragraphs = soup.find_all("p")
-            body_text = "\n".join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
-            article_text = ai_summary + "\n" + body_text if ai_summary else body_text
-
-            scraped_data.append({
-                "link": link,
-                "headline": headline,
-                "datetime_posted": datetime_text,
-                "content": article_text,
-                "scraped_at": dt.now().strftime("%Y-%m-%d %H:%M:%S"),
-            })
-        except Exception as e:
-            print(f"Error processing {link}: {e}")
-
-    save_to_csv(scraped_data, FILENAME)
-    return scraped_data
-
-# Entertainment
-def getenterarticlendtv():
-    FILENAME = "ndtv_entertainment_news.csv"
-    links = getenterndtv()
-    scraped_data = []
-
-    for link in links:
-        existing_links = get_existing_links(FILENAME)
-        if link in existing_links:
-            continue
-        try:
-            time.sleep(random.uniform(0.6, 1.2))
-            response = SESSION.get(link, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            headline_tag = soup.find("h1", class_="sp-ttl", itemprop="headline")
-            headline = headline_tag.get_text(strip=True) if headline_tag else "No headline found"
-
-            datetime_tag = soup.find("span", class_="pst-by_lnk", itemprop="dateModified")
-            if datetime_tag and datetime_tag.has_attr("content"):
-                datetime_text = datetime_tag["content"]
-            elif datetime_tag:
-                datetime_text = datetime_tag.get_text(strip=True)
-            else:
-                datetime_text = "No date/time found"
+def crawl_category(category, sink=None):
+    """Crawl one section and store its new articles; returns the rows that were scraped.
 
-            paragraphs = soup.find_all("p")
-            full_text = "\n".join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
+    With a sink, each row goes to sink(category, row) as soon as it is parsed and the sink is
+    responsible for storing it (see streaming.ArticleStream).
+    """
+    links = fetch_listing(category)
+    new_links = LINK_INDEX.new_links(category, links)
+    if sink is None:
+        scraped_data = fetch_concurrently(new_links, lambda link: scrape_article(category, link))
+        save_articles(scraped_data, category)
+        return scraped_data
 
-            scraped_data.append({
-                "link": link,
-                "headline": headline,
-                "datetime_posted": datetime_text,
-                "content": full_text,
-                "scraped_at": dt.now().strftime("%Y-%m-%d %H:%M:%S"),
-            })
-        except Exception as e:
-            print(f"Error fetching {link}: {e}")
+    def scrape_and_forward(link):
+        row = scrape_article(category, link)
+        if row is not None:
+            sink(category, row)
+        return row
 
-    save_to_csv(scraped_data, FILENAME)
-    return scraped_data
+    return fetch_concurrently(new_links, scrape_and_forward)
 
 # ---------------------------
-# Combine category CSVs (kept behavior same)
+# Combined export (ndtv_all_news.csv is written incrementally from the store)
 # ---------------------------
-category_files = [
-    "ndtv_general_news.csv",
-    "ndtv_education_news.csv",
-    "ndtv_health_news.csv",
-    "ndtv_cricket_news.csv",
-    "ndtv_science_news.csv",
-    "ndtv_world_news.csv",
-    "ndtv_entertainment_news.csv"
-]
-
-def combine_category_csvs():
-    all_data = []
-    for category_file in category_files:
-        category = category_file.split('_')[1] if '_' in category_file else category_file
-        try:
-            with open(category_file, "r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    row["category"] = category
-                    all_data.append(row)
-            print(f"Successfully read data from {category_file}")
-        except Exception as e:
-            print(f"Error reading {category_file}: {e}")
-
-    save_combined_csv(all_data)
-
-def save_combined_csv(data, filename="ndtv_all_news.csv"):
-    if not data:
-        print("No data to save.")
-        return
-    fieldnames = ["link", "headline", "datetime_posted", "content", "scraped_at", "category", "analysis_result"]
+def combine_category_csvs(filename="ndtv_all_news.csv"):
     try:
-        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for row in data:
-                if "analysis_result" not in row:
-                    row["analysis_result"] = ""
-            writer.writerows(data)
-        print(f"Successfully saved combined data to {filename}")
+        mode, count = storage.export_combined_csv(filename)
+        if mode == "unchanged":
+            print(f"{filename} is already up to date")
+        else:
+            print(f"Successfully {mode} {filename} ({count} articles)")
     except Exception as e:
         print(f"Error saving to CSV: {e}")
 
-# Keep the original behavior: combine on import (as your original file did)
-combine_category_csvs()
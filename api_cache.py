@@ -0,0 +1,129 @@
+# api_cache.py
+# Process-wide cache of parsed article rows and their serialized JSON, one entry per category,
+# plus the compressed variants and ETags the API serves for them.
+import gzip
+import hashlib
+import json
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+import storage
+
+# content codings we can serve, in order of preference
+ENCODINGS = (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def dumps(data):
+    # same shape jsonify produces (sorted keys, compact)
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class Payload:
+    """A response body with a strong ETag and lazily built, memoized compressed variants."""
+
+    def __init__(self, body):
+        self.body = body
+        self.digest = hashlib.sha1(body).hexdigest()
+        self._lock = threading.Lock()
+        self._variants = {"identity": body}
+
+    def etag(self, encoding="identity"):
+        # one tag per representation, so a gzip'd copy is never validated against a br one
+        return self.digest if encoding == "identity" else f"{self.digest}-{encoding}"
+
+    def encoded(self, encoding="identity"):
+        variant = self._variants.get(encoding)
+        if variant is None:
+            with self._lock:
+                variant = self._variants.get(encoding)
+                if variant is None:
+                    if encoding == "br":
+                        variant = brotli.compress(self.body, quality=5)
+                    elif encoding == "gzip":
+                        variant = gzip.compress(self.body, 6)
+                    else:
+                        raise ValueError(f"Unsupported encoding '{encoding}'")
+                    self._variants[encoding] = variant
+        return variant
+
+    def precompress(self):
+        for encoding in ENCODINGS:
+            self.encoded(encoding)
+        return self
+
+
+class CacheEntry:
+    def __init__(self, version, rows, dates):
+        self.version = version
+        self.rows = rows
+        # ISO posted date per row (None if unparseable), normalized by the store at write time
+        self.dates = dates
+        # built once per data version
+        self.payload = Payload(dumps(rows))
+
+    @property
+    def body(self):
+        return self.payload.body
+
+
+class ArticleCache:
+    """Serves article lists from memory until the store's data version for the category changes.
+
+    The scrape loop can also call invalidate() once a cycle finishes so the next request reloads,
+    and warm() to rebuild and compress every entry before requests arrive.
+    """
+
+    # small derived payloads (e.g. trends per query) kept per data version
+    MAX_PAYLOADS = 256
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._payloads = {}
+
+    def get(self, category=None):
+        version = storage.data_version(category)
+        entry = self._entries.get(category)
+        if entry is not None and entry.version == version:
+            return entry
+        with self._lock:
+            entry = self._entries.get(category)
+            if entry is None or entry.version != version:
+                # version is read before the rows, so a concurrent write only ever causes an extra reload
+                entry = CacheEntry(version, *storage.fetch_articles(category, with_dates=True))
+                self._entries[category] = entry
+            return entry
+
+    def payload(self, key, build):
+        """Payload for build()'s result, rebuilt when the store's overall data version changes."""
+        version = storage.data_version()
+        cached = self._payloads.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        payload = Payload(dumps(build()))
+        with self._lock:
+            if len(self._payloads) >= self.MAX_PAYLOADS:
+                self._payloads.clear()
+            self._payloads[key] = (version, payload)
+        return payload
+
+    def invalidate(self, category=None):
+        with self._lock:
+            if category is None:
+                self._entries.clear()
+                self._payloads.clear()
+            else:
+                self._entries.pop(category, None)
+                self._entries.pop(None, None)
+
+    def warm(self, categories):
+        """Load every category and the combined list, and precompute their compressed bodies."""
+        for category in [None, *categories]:
+            self.get(category).payload.precompress()
+
+
+ARTICLE_CACHE = ArticleCache()
@@ -0,0 +1,97 @@
+# benchmarks/bench_http_cache.py
+# Crawls a local stub of every section three times and reports what the response cache saves:
+#   cold     empty cache, empty store
+#   warm     same pages again: listings come back 304 (or hash-identical) and are not re-parsed
+#   recrawl  fresh store, warm cache: every article is revalidated instead of downloaded
+#
+#   python benchmarks/bench_http_cache.py --articles 20            # server sends ETag/Last-Modified
+#   python benchmarks/bench_http_cache.py --articles 20 --no-validators   # body-hash path only
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="bench_http_cache_")
+os.environ["NEWS_DB_PATH"] = os.path.join(WORKDIR, "store.db")
+os.environ["HTTP_CACHE_PATH"] = os.path.join(WORKDIR, "http_cache.db")
+# the stub is one host; don't space requests out
+os.environ.setdefault("SCRAPER_HOST_INTERVAL", "0")
+os.environ.setdefault("SCRAPER_HOST_MAX_RATE", "1000")
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Scraping  # noqa: E402
+import storage  # noqa: E402
+from categories import CATEGORY_NAMES  # noqa: E402
+from stub_server import StubServer, build_site, point_registry_at  # noqa: E402
+
+
+def crawl_all():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return sum(len(Scraping.crawl_category(category)) for category in CATEGORY_NAMES)
+
+
+def run(stub, label):
+    parsed = {"listings": 0}
+    extract_links = Scraping.extract_links
+
+    def counting_extract_links(*args, **kwargs):
+        parsed["listings"] += 1
+        return extract_links(*args, **kwargs)
+
+    Scraping.extract_links = counting_extract_links
+    stub.reset_stats()
+    started = time.perf_counter()
+    try:
+        articles = crawl_all()
+    finally:
+        Scraping.extract_links = extract_links
+    return {
+        "cycle": label,
+        "seconds": round(time.perf_counter() - started, 3),
+        "articles_stored": articles,
+        "listings_parsed": parsed["listings"],
+        "requests": stub.stats["requests"],
+        "bytes_sent": stub.stats["bytes_sent"],
+        "status": {str(k): v for k, v in sorted(stub.stats["status"].items())},
+    }
+
+
+def fresh_store(name):
+    storage.DB_PATH = os.path.join(WORKDIR, name)
+    Scraping.LINK_INDEX = Scraping.LinkIndex()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=20, help="article pages per section")
+    parser.add_argument("--scale", type=int, default=1, help="repeat the corpus this many times per section")
+    parser.add_argument("--no-validators", action="store_true", help="stub sends no ETag/Last-Modified")
+    args = parser.parse_args()
+
+    os.chdir(WORKDIR)  # no legacy CSVs here, so the store starts empty
+    try:
+        with StubServer(build_site(args.articles, args.scale), validators=not args.no_validators) as stub:
+            point_registry_at(stub.base_url)
+            results = [run(stub, "cold"), run(stub, "warm")]
+            fresh_store("recrawl.db")
+            results.append(run(stub, "recrawl"))
+        print(json.dumps({
+            "benchmark": "http_cache",
+            "validators": not args.no_validators,
+            "cache_bytes": sum(os.path.getsize(os.path.join(WORKDIR, f)) for f in os.listdir(WORKDIR) if f.startswith("http_cache.db")),
+            "results": results,
+        }, indent=2))
+    finally:
+        os.chdir("/")
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_import.py
+# Times `import flask_app` in a fresh interpreter against small and scaled-up CSV corpora.
+# Startup should not depend on dataset size and must not touch any file in the working dir.
+#
+#   python benchmarks/bench_import.py --scales 1 10 100 --repeat 5
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+import storage  # noqa: E402
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import flask_app; print(time.perf_counter() - t)"
+
+
+def _scaled_copy(src, dst, scale):
+    # header once, every data line repeated `scale` times
+    with open(src, "r", encoding="utf-8", newline="") as f:
+        header = f.readline()
+        body = f.read()
+    with open(dst, "w", encoding="utf-8", newline="") as f:
+        f.write(header)
+        for _ in range(scale):
+            f.write(body)
+
+
+def _snapshot(path):
+    return {name: os.stat(os.path.join(path, name)).st_mtime_ns for name in os.listdir(path)}
+
+
+def time_import(workdir, repeat):
+    env = dict(os.environ, PYTHONPATH=REPO, NEWS_DB_PATH=os.path.join(workdir, "ndtv_news.db"))
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=workdir, env=env,
+                             capture_output=True, text=True, check=True)
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        workdir = tempfile.mkdtemp(prefix=f"bench_import_x{scale}_")
+        try:
+            corpus = 0
+            for filename in list(storage.CATEGORY_FILES.values()) + ["ndtv_all_news.csv"]:
+                src = os.path.join(REPO, filename)
+                if os.path.exists(src):
+                    _scaled_copy(src, os.path.join(workdir, filename), scale)
+                    corpus += os.path.getsize(os.path.join(workdir, filename))
+
+            before = _snapshot(workdir)
+            timings = time_import(workdir, args.repeat)
+            after = _snapshot(workdir)
+            assert before == after, f"importing flask_app touched files: {sorted(set(after) ^ set(before)) or 'mtime changed'}"
+
+            results.append({
+                "scale": scale,
+                "corpus_bytes": corpus,
+                "median_s": round(statistics.median(timings), 4),
+                "min_s": round(min(timings), 4),
+                "max_s": round(max(timings), 4),
+            })
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({"benchmark": "import_flask_app", "repeat": args.repeat,
+                      "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
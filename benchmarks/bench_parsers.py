@@ -0,0 +1,170 @@
+# benchmarks/bench_parsers.py
+# Per-page parse + extract time for each installed parser backend, on NDTV-shaped pages.
+#
+# Fixtures are generated from the stored articles (one listing page and N article pages
+# per category) unless --fixtures points at a directory of saved pages named
+# <category>_listing*.html / <category>_article*.html. Every backend must produce exactly
+# the html.parser output on every page, otherwise the run fails.
+#
+#   python benchmarks/bench_parsers.py --pages 50 --save /tmp/ndtv_fixtures
+import argparse
+import glob
+import html
+import json
+import os
+import statistics
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+import extraction  # noqa: E402
+import storage  # noqa: E402
+from categories import CATEGORY_REGISTRY  # noqa: E402
+
+# page chrome shared by every generated page: scripts, styles and a large nav, as on the live site
+CHROME_SCRIPTS = (
+    "".join(f"<script>window.__cfg{i} = {{a: {i}, b: '<p>not text</p>'}};</script>" for i in range(20))
+    + "<style>.sp-ttl{font-weight:700} p{margin:0}</style>"
+)
+CHROME_NAV = "<nav>" + "".join(f"<a href=\"/section-{i}\">Section {i}</a>" for i in range(150)) + "</nav>"
+CHROME_FOOT = "<footer>" + "".join(f"<div class=\"ftr\"><a href=\"/f{i}\">Link {i}</a></div>" for i in range(80)) + "</footer>"
+
+
+def _page(title, body):
+    head = f"<head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>{CHROME_SCRIPTS}</head>"
+    return f"<!DOCTYPE html><html>{head}<body>{CHROME_NAV}{body}{CHROME_FOOT}</body></html>"
+
+
+def _paragraphs(content):
+    parts = [p for p in (content or "").replace("\n", " \n").split("\n") if p.strip()] or ["(empty)"]
+    out = []
+    for i, text in enumerate(parts):
+        text = html.escape(text.strip())
+        # inline markup, which every backend has to flatten the same way
+        if i % 3 == 1 and " " in text:
+            head, tail = text.split(" ", 1)
+            text = f"<strong>{head}</strong> <a href=\"/x\">{tail}</a>"
+        out.append(f"<p>{text}</p>")
+    return "".join(out)
+
+
+def article_page(category, row):
+    headline = html.escape(row["headline"] or "")
+    posted = html.escape(row["datetime_posted"] or "")
+    body = _paragraphs(row["content"])
+    if category == "health":
+        main = (f"<div class=\"__sslide\"><h1> {headline} </h1></div>"
+                f"<div class=\"article-author tpStl1\"><span> {posted} </span></div>"
+                f"<div class=\"article_storybody\">{body}</div>")
+    elif category == "cricket":
+        main = (f"<meta itemprop=\"datePublished\" content=\"2025-03-01T10:15:00+05:30\">"
+                f"<h2 class=\"sp-descp\">{headline}</h2><div class=\"story__content\">{body}</div>")
+    else:
+        summary = "<div class=\"AiSum_tx\"><ul><li>Quick take</li></ul></div>" if category == "world" else ""
+        main = (f"<h1 class=\"sp-ttl\" itemprop=\"headline\">{headline}</h1>"
+                f"<span class=\"pst-by_lnk\" itemprop=\"dateModified\">{posted}</span>{summary}"
+                f"<div class=\"Art-exp_wr\" id=\"ignorediv\">{body}</div>"
+                "<div class=\"rltd\"><p>Also read</p><p> </p></div>")
+    return _page(row["headline"] or category, f"<article>{main}</article>")
+
+
+def listing_page(category, rows):
+    items = []
+    for row in rows:
+        href = html.escape(row["link"])
+        title = html.escape(row["headline"] or "")
+        if category == "education":
+            items.append(f"<div class=\"crd\"><a class=\"crd_lnk\" href=\"{href}\">{title}</a></div>")
+        elif category == "health":
+            items.append(f"<div class=\"stry-cont\"><a href=\"{href}\">{title}</a></div>")
+        elif category in ("cricket", "world"):
+            cls, a_cls = ("crd_ttl", "crd_lnk") if category == "cricket" else ("crd_ttl8", "crd_lnk")
+            items.append(f"<div class=\"crd_txt-wrp\"><h3 class=\"{cls}\"><a class=\"{a_cls}\" href=\"{href}\">{title}</a></h3></div>")
+        else:
+            items.append(f"<div class=\"NwsLstPg_txt-wrp\"><h2 class=\"NwsLstPg_ttl\">"
+                         f"<a class=\"NwsLstPg_ttl-lnk\" href=\"{href}\">{title}</a></h2></div>")
+    return _page(category, "<main>" + "".join(items) + "</main>")
+
+
+def generated_fixtures(pages):
+    fixtures = []
+    for category in storage.CATEGORIES:
+        rows = storage.fetch_articles(category)[:pages]
+        if not rows:
+            continue
+        fixtures.append((category, "listing", f"{category}_listing.html", listing_page(category, rows).encode("utf-8")))
+        for i, row in enumerate(rows):
+            fixtures.append((category, "article", f"{category}_article{i:03d}.html", article_page(category, row).encode("utf-8")))
+    return fixtures
+
+
+def saved_fixtures(directory):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        name = os.path.basename(path)
+        category, _, rest = name.partition("_")
+        kind = "listing" if rest.startswith("listing") else "article"
+        if category in CATEGORY_REGISTRY:
+            with open(path, "rb") as f:
+                fixtures.append((category, kind, name, f.read()))
+    return fixtures
+
+
+def extract(backend, category, kind, page):
+    config = CATEGORY_REGISTRY[category]
+    if kind == "listing":
+        return extraction.extract_links(config["listing"], page, backend)
+    return extraction.extract_article(config["article"], page, backend)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=30, help="article pages per category when generating")
+    parser.add_argument("--fixtures", help="directory of saved pages to use instead of generated ones")
+    parser.add_argument("--save", help="write the generated pages to this directory")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fixtures = saved_fixtures(args.fixtures) if args.fixtures else generated_fixtures(args.pages)
+    if not fixtures:
+        sys.exit("no fixtures to benchmark")
+    if args.save:
+        os.makedirs(args.save, exist_ok=True)
+        for _, _, name, page in fixtures:
+            with open(os.path.join(args.save, name), "wb") as f:
+                f.write(page)
+
+    backends = extraction.available_backends()
+    expected = [extract("html.parser", category, kind, page) for category, kind, _, page in fixtures]
+
+    results = {}
+    for name in backends:
+        mismatches = [fx[2] for fx, want in zip(fixtures, expected) if extract(name, fx[0], fx[1], fx[3]) != want]
+        per_page = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            for category, kind, _, page in fixtures:
+                extract(name, category, kind, page)
+            per_page.append((time.perf_counter() - started) / len(fixtures))
+        results[name] = {
+            "per_page_ms": round(statistics.median(per_page) * 1000, 3),
+            "mismatches": mismatches,
+        }
+
+    baseline = results["html.parser"]["per_page_ms"]
+    for result in results.values():
+        result["speedup"] = round(baseline / result["per_page_ms"], 2)
+    print(json.dumps({
+        "benchmark": "parsers",
+        "pages": len(fixtures),
+        "avg_page_kb": round(sum(len(fx[3]) for fx in fixtures) / len(fixtures) / 1024, 1),
+        "results": results,
+    }, indent=2))
+    if any(result["mismatches"] for result in results.values()):
+        sys.exit("backends disagree with html.parser on some pages")
+
+
+if __name__ == "__main__":
+    main()
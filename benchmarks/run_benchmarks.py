@@ -0,0 +1,187 @@
+# benchmarks/run_benchmarks.py
+# Offline benchmark suite: the crawl, sentiment, export and API paths timed on the checked-in
+# CSVs (optionally scaled up) and on a replayed HTML corpus served by a local stub server.
+#
+#   python benchmarks/run_benchmarks.py --scales 1 10 100 --output bench.json
+#
+# Each run prints one JSON document (git revision, settings, per-scale stage timings), so runs
+# from different commits can be diffed directly. Nothing in the repository is modified; every
+# scale works in its own temp directory.
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# the stub server is a single host: don't space requests out, and measure the crawl without the response cache
+os.environ.setdefault("SCRAPER_HOST_INTERVAL", "0")
+os.environ.setdefault("SCRAPER_HOST_MAX_RATE", "1000")
+os.environ["HTTP_CACHE_PATH"] = ""
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO)
+
+import Scraping  # noqa: E402
+import flask_app  # noqa: E402
+import near_duplicates  # noqa: E402
+import pipeline  # noqa: E402
+import sentiment_analysis  # noqa: E402
+import storage  # noqa: E402
+from api_cache import ARTICLE_CACHE  # noqa: E402
+from stub_server import StubServer, build_site, point_registry_at  # noqa: E402
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def scale_csvs(workdir, scale):
+    """Copy every category CSV into workdir with each row repeated `scale` times under distinct links."""
+    rows_written = 0
+    for filename in storage.CATEGORY_FILES.values():
+        src = os.path.join(REPO, filename)
+        if not os.path.exists(src):
+            continue
+        with open(src, "r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            fields, rows = reader.fieldnames, list(reader)
+        with open(os.path.join(workdir, filename), "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for copy in range(scale):
+                for row in rows:
+                    if copy:
+                        row = dict(row, link=f"{row['link']}?copy={copy}")
+                    writer.writerow(row)
+                    rows_written += 1
+    return rows_written
+
+
+@contextlib.contextmanager
+def stage(results, name):
+    # stage output (progress prints) is swallowed so the JSON stays the only thing on stdout
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+    results[name] = {"seconds": round(time.perf_counter() - started, 4)}
+
+
+def time_requests(client, path, repeat, headers=None):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers or {})
+        timings.append(time.perf_counter() - started)
+        if response.status_code not in (200, 304):
+            raise RuntimeError(f"{path} returned {response.status_code}")
+    return {"median_ms": round(statistics.median(timings) * 1000, 3), "bytes": len(response.data)}
+
+
+def run_scale(scale, args):
+    workdir = tempfile.mkdtemp(prefix=f"bench_x{scale}_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    stages = {}
+    try:
+        csv_rows = scale_csvs(workdir, scale)
+        storage.DB_PATH = os.path.join(workdir, "ndtv_news.db")
+        ARTICLE_CACHE.invalidate()
+
+        # legacy CSVs -> store (first connection imports them)
+        with stage(stages, "store_import"):
+            storage.get_connection()
+        stored = storage.get_connection().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+        with stage(stages, "near_duplicates"):
+            near_duplicates.detect_new()
+
+        with stage(stages, "sentiment"):
+            sentiment_analysis.sentiment_analysis(full=True, backend=args.backend)
+        stages["sentiment"]["docs_per_sec"] = round(stored / stages["sentiment"]["seconds"], 1)
+
+        with stage(stages, "combine_rewrite"):
+            Scraping.combine_category_csvs()
+        with stage(stages, "combine_unchanged"):
+            Scraping.combine_category_csvs()
+
+        client = flask_app.app.test_client()
+        ARTICLE_CACHE.invalidate()
+        stages["trends_cold"] = time_requests(client, "/api/sentiment-trends", 1)
+        stages["trends_warm"] = time_requests(client, "/api/sentiment-trends", args.repeat)
+        stages["trends_filtered"] = time_requests(client, "/api/sentiment-trends?category=world,health", args.repeat)
+        stages["all_articles_cold"] = time_requests(client, "/api/allndtv", 1)
+        stages["all_articles_gzip"] = time_requests(client, "/api/allndtv", args.repeat, {"Accept-Encoding": "gzip"})
+        stages["search"] = time_requests(client, "/api/search?q=india&limit=20", args.repeat)
+
+        # replayed HTML: listing + article pages for every section through the real crawl path,
+        # into a separate store so the CSV-based numbers above are unaffected
+        site = build_site(args.crawl_articles, scale)
+        storage.DB_PATH = os.path.join(workdir, "crawl.db")
+        Scraping.LINK_INDEX = Scraping.LinkIndex()
+        Scraping.LISTING_LINKS.clear()
+        with StubServer(site) as stub:
+            point_registry_at(stub.base_url)
+            with stage(stages, "crawl"):
+                report = pipeline.scrape_categories_parallel()
+        crawled = sum(result["articles"] for result in report.values())
+        stages["crawl"].update({
+            "pages": stub.stats["requests"],
+            "articles": crawled,
+            "pages_per_sec": round(stub.stats["requests"] / stages["crawl"]["seconds"], 1),
+        })
+
+        return {"scale": scale, "csv_rows": csv_rows, "stored_articles": stored, "stages": stages}
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline crawl / sentiment / export / API benchmarks.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="row multipliers for the CSV corpus")
+    parser.add_argument("--crawl-articles", type=int, default=5, help="article pages per section at scale 1")
+    parser.add_argument("--backend", default=sentiment_analysis.SENTIMENT_BACKEND, choices=sorted(sentiment_analysis.BACKENDS))
+    parser.add_argument("--repeat", type=int, default=5, help="requests per API timing")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    started = time.strftime("%Y-%m-%dT%H:%M:%S")
+    results = [run_scale(scale, args) for scale in args.scales]
+    document = {
+        "benchmark": "suite",
+        "git_revision": git_revision(),
+        "timestamp": started,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "sentiment_backend": args.backend,
+            "sentiment_workers": sentiment_analysis.SENTIMENT_WORKERS,
+            "scraper_workers": Scraping.SCRAPER_WORKERS,
+            "crawl_articles_per_section": args.crawl_articles,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    text = json.dumps(document, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/stub_server.py
+# Local HTTP server replaying fixed pages, with optional ETag / Last-Modified support,
+# so the crawler can be exercised end to end without touching ndtv.com.
+import csv
+import hashlib
+import os
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_parsers import REPO, article_page, listing_page
+from categories import CATEGORY_REGISTRY
+
+
+class StubServer:
+    """Serves {path: bytes}; counts requests, status codes and body bytes sent."""
+
+    def __init__(self, pages=None, validators=True, last_modified=None):
+        self.pages = dict(pages or {})
+        self.validators = validators
+        self.last_modified = last_modified or formatdate(usegmt=True)
+        self.lock = threading.Lock()
+        self.reset_stats()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"requests": 0, "bytes_sent": 0, "status": {}}
+
+    def _record(self, status, sent):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_sent"] += sent
+            self.stats["status"][status] = self.stats["status"].get(status, 0) + 1
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = stub.pages.get(self.path.split("?", 1)[0])
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    stub._record(404, 0)
+                    return
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if stub.validators and (
+                    self.headers.get("If-None-Match") == etag
+                    or (self.headers.get("If-None-Match") is None
+                        and self.headers.get("If-Modified-Since") == stub.last_modified)
+                ):
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    stub._record(304, 0)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                if stub.validators:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", stub.last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+                stub._record(200, len(body))
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def corpus_rows(category, limit=None):
+    """Rows from the section's legacy CSV, the same data the store is seeded with."""
+    path = os.path.join(REPO, CATEGORY_REGISTRY[category].get("csv") or "")
+    if not os.path.isfile(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        rows = [row for row in csv.DictReader(f) if row.get("link")]
+    return rows[:limit] if limit else rows
+
+
+def build_site(articles_per_category=20, scale=1):
+    """Listing + article pages for every registered section, served under /listing/<cat> and /article/<cat>/<n>.
+
+    `scale` repeats the corpus to get more distinct article pages per listing.
+    """
+    pages = {}
+    for category in CATEGORY_REGISTRY:
+        base = corpus_rows(category, articles_per_category)
+        rows = []
+        for n in range(len(base) * scale):
+            row = dict(base[n % len(base)])
+            row["link"] = f"/article/{category}/{n}"
+            pages[row["link"]] = article_page(category, row).encode("utf-8")
+            rows.append(row)
+        if rows:
+            pages[f"/listing/{category}"] = listing_page(category, rows).encode("utf-8")
+    return pages
+
+
+def point_registry_at(base_url):
+    """Redirect every section's listing URL and link host to the stub (in this process only)."""
+    for category, config in CATEGORY_REGISTRY.items():
+        config["url"] = f"{base_url}/listing/{category}"
+        config["host"] = base_url
@@ -0,0 +1,110 @@
+# categories.py
+# Registry of the NDTV sections we crawl. Adding a section is one entry here:
+# the crawl, the store, sentiment analysis and the API all read from this table.
+#
+#   route    API path serving the section's stored articles
+#   url      listing page that links to the section's latest articles
+#   host     base for relative hrefs found on that page
+#   csv      legacy per-category CSV, imported into the store once (None for new sections)
+#   listing  selector spec for article links on the listing page (see extraction.extract_links)
+#   article  selector spec for headline / date / body on article pages (see extraction.extract_article)
+#   poll     optional {"min": s, "max": s} bounds for the section's adaptive polling interval
+#            (defaults: POLL_MIN_INTERVAL / POLL_MAX_INTERVAL in pipeline.py)
+
+NDTV_HOST = "https://www.ndtv.com"
+
+# shared by the sections that use the main site's article template
+_NDTV_HEADLINE = {"selector": "h1.sp-ttl[itemprop=headline]", "default": "No headline found"}
+_NDTV_DATE = {"selector": "span.pst-by_lnk[itemprop=dateModified]", "attr": "content", "default": "No date/time found"}
+_ALL_PARAGRAPHS = {"container": None, "separator": "\n", "skip_empty": True}
+_NDTV_LIST = {"items": "div.NwsLstPg_txt-wrp", "link": "h2.NwsLstPg_ttl a"}
+
+CATEGORY_REGISTRY = {
+    "general": {
+        "route": "/api/generalndtv",
+        "url": "https://www.ndtv.com/latest",
+        "host": NDTV_HOST,
+        "csv": "ndtv_general_news.csv",
+        "poll": {"min": 120, "max": 1800},
+        "listing": dict(_NDTV_LIST, fallbacks=[
+            {"items": "h2", "link": "a[href]"},
+            {"items": "a[href]", "require_text": True,
+             "href_contains": ["/news/", "/latest", "/india-news/", "/world-news/"]},
+        ]),
+        "article": {
+            "headline": {"selector": "h1.sp-ttl", "default": None},
+            "date": {"selector": "span.pst-by_lnk", "default": None},
+            "body": {"container": "div#ignorediv", "fallback_to_document": True, "separator": " ", "default": None},
+        },
+    },
+    "education": {
+        "route": "/api/edundtv",
+        "url": "https://www.ndtv.com/education",
+        "host": NDTV_HOST,
+        "csv": "ndtv_education_news.csv",
+        "listing": {"items": "a.crd_lnk"},
+        "article": {
+            "headline": {"selector": "h1.sp-ttl[itemprop=headline]", "default": "No headline"},
+            "date": {"selector": "span.pst-by_lnk[itemprop=dateModified]", "default": "No date/time"},
+            "body": {"container": "div.Art-exp_wr#ignorediv", "separator": "\n"},
+        },
+    },
+    "health": {
+        "route": "/api/healthndtv",
+        "url": "https://doctor.ndtv.com/top-stories",
+        "host": "https://doctor.ndtv.com",
+        "csv": "ndtv_health_news.csv",
+        "poll": {"min": 900},
+        "listing": {"items": "div.stry-cont", "link": "a[href]"},
+        "article": {
+            "headline": {"selector": "div.__sslide h1", "text": "raw", "default": "No headline found"},
+            "date": {"selector": "div.article-author.tpStl1 span", "text": "raw", "default": "No datetime found"},
+            "body": {"container": "div.article_storybody", "text": "raw", "separator": " "},
+        },
+    },
+    "cricket": {
+        "route": "/api/cricketndtv",
+        "url": "https://sports.ndtv.com/cricket",
+        "host": "https://sports.ndtv.com",
+        "csv": "ndtv_cricket_news.csv",
+        "poll": {"min": 180, "max": 3600},
+        "listing": {"items": "div.crd_txt-wrp", "link": "h3.crd_ttl a.crd_lnk"},
+        "article": {
+            "headline": {"selector": "h2.sp-descp", "default": "No headline found"},
+            "date": {"selector": "meta[itemprop=datePublished]", "attr": "content", "text_fallback": False,
+                     "replace": [("T", " "), ("+05:30", "")], "default": "No date/time found"},
+            "body": {"container": "div.story__content", "separator": "\n"},
+        },
+    },
+    "science": {
+        "route": "/api/sciencendtv",
+        "url": "https://www.ndtv.com/science",
+        "host": NDTV_HOST,
+        "csv": "ndtv_science_news.csv",
+        "listing": _NDTV_LIST,
+        "article": {"headline": _NDTV_HEADLINE, "date": _NDTV_DATE, "body": _ALL_PARAGRAPHS},
+    },
+    "world": {
+        "route": "/api/worldndtv",
+        "url": "https://www.ndtv.com/world",
+        "host": NDTV_HOST,
+        "csv": "ndtv_world_news.csv",
+        "listing": {"items": "div.crd_txt-wrp", "link": "h3.crd_ttl8 a[href]"},
+        "article": {"headline": _NDTV_HEADLINE, "date": _NDTV_DATE, "body": _ALL_PARAGRAPHS, "summary": "div.AiSum_tx"},
+    },
+    "entertainment": {
+        "route": "/api/enterndtv",
+        "url": "https://www.ndtv.com/entertainment/latest",
+        "host": NDTV_HOST,
+        "csv": "ndtv_entertainment_news.csv",
+        "listing": {"items": "div.NwsLstPg_txt-wrp", "link": "h2.NwsLstPg_ttl a.NwsLstPg_ttl-lnk"},
+        "article": {"headline": _NDTV_HEADLINE, "date": _NDTV_DATE, "body": _ALL_PARAGRAPHS},
+    },
+}
+
+CATEGORY_NAMES = list(CATEGORY_REGISTRY)
+
+def get_category(name):
+    if name not in CATEGORY_REGISTRY:
+        raise ValueError(f"Unknown category '{name}' (choose from {', '.join(CATEGORY_NAMES)})")
+    return CATEGORY_REGISTRY[name]
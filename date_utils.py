@@ -0,0 +1,173 @@
+# date_utils.py
+# Normalizes the assorted date strings NDTV pages give us into one canonical ISO timestamp.
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Preprocess datetime strings to handle IST timezone
+def clean_datetime(dt_str):
+    if pd.isna(dt_str):
+        return dt_str
+
+    # Convert to string if not already
+    dt_str = str(dt_str)
+
+    # Remove IST and other timezone indicators
+    if "IST" in dt_str:
+        dt_str = dt_str.replace("IST", "").strip()
+
+    # Handle common prefixes in NDTV dates
+    prefixes = ["Updated:", "Published On:", "Posted on:"]
+    for prefix in prefixes:
+        if dt_str.startswith(prefix):
+            dt_str = dt_str[len(prefix):].strip()
+
+    return dt_str
+
+# Try to parse dates with multiple formats (slow path for strings no known layout matches)
+def parse_date_with_formats(date_str):
+    if pd.isna(date_str):
+        return None
+
+    formats = [
+        '%B %d, %Y %I:%M %p',  # May 03, 2025 04:10 am
+        '%B %d, %Y',           # May 03, 2025
+        '%d %B %Y',            # 03 May 2025
+        '%Y-%m-%d',            # 2025-05-03
+        '%d/%m/%Y',            # 03/05/2025
+        '%m/%d/%Y'             # 05/03/2025
+    ]
+
+    for fmt in formats:
+        try:
+            return pd.to_datetime(date_str, format=fmt).date()
+        except:
+            continue
+
+    # If all formats fail, try pandas default parser
+    try:
+        return pd.to_datetime(date_str).date()
+    except:
+        return None
+
+# ---------------------------
+# Canonical timestamps
+# ---------------------------
+# Layouts seen in the scraped data, checked on the cleaned string. Strings without an
+# offset are NDTV local time (IST).
+# Bump LAYOUTS_VERSION when adding one: the store re-parses the rows left without a date.
+LAYOUTS_VERSION = "2"
+KNOWN_LAYOUTS = [
+    # Sat, 03 May 2025 13:27:01 +0530  (content attribute on science/world/entertainment)
+    (re.compile(r"^[A-Z][a-z]{2}, \d{1,2} [A-Z][a-z]{2} \d{4} \d{2}:\d{2}:\d{2} [+-]\d{4}$"), "%a, %d %b %Y %H:%M:%S %z"),
+    # May 04, 2025 18:01 pm  (general/education: 24-hour time with a redundant am/pm, dropped before parsing)
+    (re.compile(r"^[A-Z][a-z]{2} \d{1,2}, \d{4} (?:00|1[3-9]|2[0-3]):\d{2} [AaPp][Mm]$"), "%b %d, %Y %H:%M"),
+    (re.compile(r"^[A-Z][a-z]+ \d{1,2}, \d{4} (?:00|1[3-9]|2[0-3]):\d{2} [AaPp][Mm]$"), "%B %d, %Y %H:%M"),
+    # May 03, 2025 04:10 pm  (general/education, "IST" stripped)
+    (re.compile(r"^[A-Z][a-z]{2} \d{1,2}, \d{4} \d{1,2}:\d{2} [AaPp][Mm]$"), "%b %d, %Y %I:%M %p"),
+    (re.compile(r"^[A-Z][a-z]+ \d{1,2}, \d{4} \d{1,2}:\d{2} [AaPp][Mm]$"), "%B %d, %Y %I:%M %p"),
+    # May 5, 2025 10:32  (health, "Updated:" and "IST" stripped)
+    (re.compile(r"^[A-Z][a-z]{2} \d{1,2}, \d{4} \d{1,2}:\d{2}$"), "%b %d, %Y %H:%M"),
+    # 2025-05-03 13:45:00  (cricket datePublished with the +05:30 removed)
+    (re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}$"), "%Y-%m-%d %H:%M:%S"),
+    # 2025-05-03T13:45:00+05:30  (raw ISO meta content)
+    (re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})$"), "iso"),
+]
+
+_cache = {}
+_cache_lock = threading.Lock()
+_CACHE_LIMIT = 100000
+
+def _to_iso(parsed):
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=IST)
+    return parsed.isoformat()
+
+_MERIDIEM = re.compile(r" [AaPp][Mm]$")
+
+def _prepare(cleaned, fmt):
+    # 2025-05-03T13:45:00 and 2025-05-03 13:45:00 share one layout
+    if fmt.startswith("%Y-%m-%d"):
+        return cleaned.replace("T", " ", 1)
+    # a 24-hour time needs no am/pm
+    if fmt.endswith("%H:%M"):
+        return _MERIDIEM.sub("", cleaned)
+    return cleaned
+
+def _parse_one(cleaned):
+    for pattern, fmt in KNOWN_LAYOUTS:
+        if pattern.match(cleaned):
+            try:
+                if fmt == "iso":
+                    return _to_iso(datetime.fromisoformat(cleaned.replace("Z", "+00:00")))
+                return _to_iso(datetime.strptime(_prepare(cleaned, fmt), fmt))
+            except ValueError:
+                break
+    date = parse_date_with_formats(cleaned)
+    if date is None or pd.isna(date):
+        return None
+    return datetime(date.year, date.month, date.day, tzinfo=IST).isoformat()
+
+def normalize_datetime(raw):
+    """Canonical ISO-8601 timestamp for a raw datetime_posted string, or None if it isn't a date.
+
+    Each distinct string is parsed once per process.
+    """
+    if raw is None or raw == "" or (not isinstance(raw, str) and pd.isna(raw)):
+        return None
+    try:
+        return _cache[raw]
+    except KeyError:
+        pass
+    value = _parse_one(clean_datetime(raw).strip())
+    with _cache_lock:
+        if len(_cache) >= _CACHE_LIMIT:
+            _cache.clear()
+        _cache[raw] = value
+    return value
+
+def normalize_many(values):
+    """normalize_datetime over a whole column: distinct strings are grouped by layout and each
+    group is parsed with one vectorized pd.to_datetime call."""
+    values = list(values)
+    pending = {v for v in values if isinstance(v, str) and v and v not in _cache}
+    groups = {}
+    leftovers = []
+    for raw in pending:
+        cleaned = clean_datetime(raw).strip()
+        for pattern, fmt in KNOWN_LAYOUTS:
+            if fmt != "iso" and pattern.match(cleaned):
+                groups.setdefault(fmt, []).append((raw, _prepare(cleaned, fmt)))
+                break
+        else:
+            leftovers.append(raw)
+
+    parsed = {}
+    for fmt, items in groups.items():
+        if "%z" in fmt:
+            # keep the source offset (not UTC) so the calendar day matches the page
+            for raw, cleaned in items:
+                parsed[raw] = _parse_one(cleaned)
+            continue
+        series = pd.to_datetime(pd.Series([cleaned for _, cleaned in items]), format=fmt, errors="coerce")
+        for (raw, _), value in zip(items, series):
+            if pd.isna(value):
+                leftovers.append(raw)
+            else:
+                parsed[raw] = value.to_pydatetime().replace(tzinfo=IST).isoformat()
+    with _cache_lock:
+        if len(_cache) + len(parsed) >= _CACHE_LIMIT:
+            _cache.clear()
+        _cache.update(parsed)
+    for raw in leftovers:
+        normalize_datetime(raw)
+    return [normalize_datetime(v) for v in values]
+
+def posted_date(dt_str):
+    """Calendar date (YYYY-MM-DD) of a raw datetime_posted value, or None when it can't be parsed."""
+    value = normalize_datetime(dt_str)
+    return value[:10] if value else None
@@ -0,0 +1,262 @@
+# extraction.py
+# Applies declarative selector specs (see categories.py) to HTML through pluggable parser backends.
+import os
+
+from bs4 import BeautifulSoup, UnicodeDammit
+
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# "auto" picks the fastest backend that is installed
+SCRAPER_PARSER = os.environ.get("SCRAPER_PARSER", "auto")
+
+# ---------------------------
+# Selector specs (one listing and one article spec per section, see categories.py)
+# ---------------------------
+# Listing specs: every `items` match contributes the href of its first `link` match
+# (or of the item itself when there is no `link`). `fallbacks` are tried in order
+# when the page has no items at all, until one of them yields links.
+#
+# Article specs: headline / date fields and a body. Text is read like BeautifulSoup's
+# get_text(strip=True) unless a field sets "text": "raw" (get_text().strip()). A field
+# with "attr" prefers that attribute and falls back to the element text unless
+# "text_fallback" is False. The body joins the <p> texts under its container.
+
+# get_text() leaves out the contents of these; the other backends drop them after parsing, and
+# the soup backend skips selector matches inside a <template> so every backend sees the same elements
+NON_TEXT_TAGS = ("script", "style", "template")
+
+# ---------------------------
+# Parser backends
+# ---------------------------
+def _decode(html):
+    if isinstance(html, str):
+        return html
+    try:
+        return html.decode("utf-8")
+    except UnicodeDecodeError:
+        return UnicodeDammit(html, is_html=True).unicode_markup
+
+
+class ParserBackend:
+    """Parses a page once and answers CSS selector, text and attribute lookups on it."""
+
+    name = None
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def parse(self, html):
+        raise NotImplementedError
+
+    def select_one(self, node, selector):
+        raise NotImplementedError
+
+    def select(self, node, selector):
+        raise NotImplementedError
+
+    def text(self, node, raw=False):
+        raise NotImplementedError
+
+    def attr(self, node, name):
+        raise NotImplementedError
+
+
+class SoupBackend(ParserBackend):
+    """BeautifulSoup on the pure-Python html.parser, the scrapers' original setup."""
+
+    name = "html.parser"
+
+    def parse(self, html):
+        return BeautifulSoup(html, "html.parser")
+
+    def select_one(self, node, selector):
+        found = node.select_one(selector)
+        if found is None or found.find_parent("template") is None:
+            return found
+        found = self.select(node, selector)
+        return found[0] if found else None
+
+    def select(self, node, selector):
+        return [n for n in node.select(selector) if n.find_parent("template") is None]
+
+    def text(self, node, raw=False):
+        return node.get_text().strip() if raw else node.get_text(strip=True)
+
+    def attr(self, node, name):
+        return node.get(name)
+
+
+class LxmlBackend(ParserBackend):
+    name = "lxml"
+
+    def __init__(self):
+        self._selectors = {}
+
+    @classmethod
+    def available(cls):
+        return lxml is not None
+
+    def _compiled(self, selector):
+        compiled = self._selectors.get(selector)
+        if compiled is None:
+            compiled = self._selectors[selector] = CSSSelector(selector, translator="html")
+        return compiled
+
+    def parse(self, html):
+        doc = lxml.html.document_fromstring(_decode(html))
+        etree.strip_elements(doc, *NON_TEXT_TAGS, with_tail=False)
+        return doc
+
+    def select_one(self, node, selector):
+        found = self.select(node, selector)
+        return found[0] if found else None
+
+    def select(self, node, selector):
+        # CSSSelector searches descendant-or-self; keep to descendants like soupsieve
+        return [n for n in self._compiled(selector)(node) if n is not node]
+
+    def text(self, node, raw=False):
+        if raw:
+            return "".join(node.itertext()).strip()
+        return "".join(s.strip() for s in node.itertext())
+
+    def attr(self, node, name):
+        return node.get(name)
+
+
+class SelectolaxBackend(ParserBackend):
+    name = "selectolax"
+
+    @classmethod
+    def available(cls):
+        return LexborHTMLParser is not None
+
+    def parse(self, html):
+        tree = LexborHTMLParser(_decode(html))
+        tree.strip_tags(list(NON_TEXT_TAGS))
+        return tree
+
+    def select_one(self, node, selector):
+        found = self.select(node, selector)
+        return found[0] if found else None
+
+    def select(self, node, selector):
+        # lexbor also matches the node a query starts from; soupsieve only looks below it
+        found = node.css(selector)
+        mem_id = getattr(node, "mem_id", None)
+        return [n for n in found if n.mem_id != mem_id] if mem_id is not None else found
+
+    def text(self, node, raw=False):
+        if raw:
+            return node.text(deep=True).strip()
+        return node.text(deep=True, separator="", strip=True)
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+
+BACKENDS = {backend.name: backend for backend in (SoupBackend, LxmlBackend, SelectolaxBackend)}
+_backend_instances = {}
+
+def available_backends():
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+def get_backend(name=None):
+    name = name or SCRAPER_PARSER
+    if name == "auto":
+        name = next(n for n in ("selectolax", "lxml", "html.parser") if BACKENDS[n].available())
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend '{name}' (choose from auto, {', '.join(BACKENDS)})")
+    if not BACKENDS[name].available():
+        raise ValueError(f"Parser backend '{name}' is not installed")
+    if name not in _backend_instances:
+        _backend_instances[name] = BACKENDS[name]()
+    return _backend_instances[name]
+
+# ---------------------------
+# Extraction
+# ---------------------------
+def _links(backend, doc, spec):
+    items = backend.select(doc, spec["items"])
+    hrefs = []
+    for item in items:
+        a = backend.select_one(item, spec["link"]) if spec.get("link") else item
+        if a is None:
+            continue
+        href = backend.attr(a, "href")
+        if not href:
+            continue
+        if spec.get("require_text") and not backend.text(a):
+            continue
+        if spec.get("href_contains") and not any(x in href for x in spec["href_contains"]):
+            continue
+        hrefs.append(href)
+    return items, hrefs
+
+def extract_links(spec, html, backend=None):
+    """Raw hrefs from a listing page, in page order (not resolved or deduped)."""
+    backend = get_backend(backend)
+    doc = backend.parse(html)
+    items, hrefs = _links(backend, doc, spec)
+    if not items:
+        for fallback in spec.get("fallbacks", []):
+            _, hrefs = _links(backend, doc, fallback)
+            if hrefs:
+                break
+    return hrefs
+
+def _field(backend, doc, spec):
+    node = backend.select_one(doc, spec["selector"])
+    if node is None:
+        return spec.get("default")
+    if "attr" in spec:
+        value = backend.attr(node, spec["attr"])
+        if value is None:
+            if spec.get("text_fallback", True) is False:
+                return spec.get("default")
+            value = backend.text(node, spec.get("text") == "raw")
+    else:
+        value = backend.text(node, spec.get("text") == "raw")
+    for old, new in spec.get("replace", []):
+        value = value.replace(old, new)
+    return value
+
+def _body(backend, doc, spec):
+    raw = spec.get("text") == "raw"
+    container = backend.select_one(doc, spec["container"]) if spec.get("container") else doc
+    if container is None and spec.get("fallback_to_document"):
+        container = doc
+    paragraphs = backend.select(container, "p") if container is not None else []
+    if not paragraphs:
+        return spec.get("default", "")
+    texts = (backend.text(p, raw) for p in paragraphs)
+    if spec.get("skip_empty"):
+        texts = (t for t in texts if t)
+    return spec.get("separator", " ").join(texts)
+
+def extract_article(spec, html, backend=None):
+    """headline / datetime_posted / content for an article page, per an article spec."""
+    backend = get_backend(backend)
+    doc = backend.parse(html)
+    content = _body(backend, doc, spec["body"])
+    if spec.get("summary"):
+        node = backend.select_one(doc, spec["summary"])
+        summary = backend.text(node) if node is not None else ""
+        if summary:
+            content = summary + "\n" + content
+    return {
+        "headline": _field(backend, doc, spec["headline"]),
+        "datetime_posted": _field(backend, doc, spec["date"]),
+        "content": content,
+    }
@@ -1,93 +1,40 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request, stream_with_context
 from threading import Thread
-import time
 from flask_cors import CORS
-from datetime import datetime as dt
-import csv
-import pandas as pd
-from collections import defaultdict
+import sqlite3
+import json
 import os
-from Scraping import (
-    getgeneralarticlendtv,
-    geteduarticlendtv,
-    gethealtharticlendtv,
-    getcricketarticlendtv,
-    getsciencearticlendtv,
-    getworldarticlendtv,
-    getenterarticlendtv,
-    combine_category_csvs
-)
-from sentiment_analysis import sentiment_analysis
+import re
+import time
+import metrics
+import pipeline
+import storage
+from categories import CATEGORY_REGISTRY
+from pipeline import run_forever
+from streaming import publish_to_cache
+from api_cache import ARTICLE_CACHE, ENCODINGS, Payload, dumps
 
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=["X-Total-Count", "X-Next-Offset"])
+
+
+# Browsers and proxies may reuse a response this long, then revalidate it with If-None-Match
+API_MAX_AGE = int(os.environ.get("API_MAX_AGE", "60"))
+
+
+def refresh_api_cache():
+    # fresh data is in the store after each cycle: rebuild the cached bodies and their
+    # compressed variants now, once, instead of on the next requests. Entries are keyed on the
+    # store's data version, so only the lists that changed are rebuilt.
+    ARTICLE_CACHE.warm(CATEGORY_REGISTRY)
+    ARTICLE_CACHE.payload(("trends", (), None, None), trend_percentages).precompress()
 
 
 # Background scraping loop
 def start_scraping_loop():
-    while True:
-        print("Starting scraping at", dt.now().strftime("%Y-%m-%d %H:%M:%S"))
-
-        try:
-            # Latest news from NDTV
-            print("Scraping latest news from NDTV...")
-            latest_data = getgeneralarticlendtv()
-            print(
-                f"Scraped {len(latest_data) if latest_data else 0} latest news articles"
-            )
-
-            # Education news from NDTV
-            print("Scraping education news from NDTV...")
-            edu_data = geteduarticlendtv()
-            print(f"Scraped {len(edu_data) if edu_data else 0} education news articles")
-
-            # Health news from NDTV
-            print("Scraping health news from NDTV...")
-            health_data = gethealtharticlendtv()
-            print(
-                f"Scraped {len(health_data) if health_data else 0} health news articles"
-            )
-
-            # Cricket news from NDTV
-            print("Scraping cricket news from NDTV...")
-            cricket_data = getcricketarticlendtv()
-            print(
-                f"Scraped {len(cricket_data) if cricket_data else 0} cricket news articles"
-            )
-
-            # Science news from NDTV
-            print("Scraping science news from NDTV...")
-            science_data = getsciencearticlendtv()
-            print(
-                f"Scraped {len(science_data) if science_data else 0} science news articles"
-            )
-
-            # World news from NDTV
-            print("Scraping world news from NDTV...")
-            world_data = getworldarticlendtv()
-            print(f"Scraped {len(world_data) if world_data else 0} world news articles")
-
-            # Entertainment news from NDTV
-            print("Scraping entertainment news from NDTV...")
-            enter_data = getenterarticlendtv()
-            print(
-                f"Scraped {len(enter_data) if enter_data else 0} entertainment news articles"
-            )
-
-            print("All scraping completed at", dt.now().strftime("%Y-%m-%d %H:%M:%S"))
-
-            #combine category csvs
-            combine_category_csvs()
-
-            # Run sentiment analysis
-            sentiment_analysis()
-
-        except Exception as e:
-            print(f"Error during scraping: {e}")
-
-        print("Sleeping for 1 hour...\n")
-        time.sleep(3600)  # 1 hour
+    # this process serves the API, so streamed rows are published to its response cache as they land
+    run_forever(on_cycle_complete=refresh_api_cache, stream_publish=publish_to_cache)
 
 
 def start_background_thread():
@@ -95,307 +42,312 @@ def start_background_thread():
     thread.daemon = True  # Thread will exit when Flask exits
     thread.start()
 
-# Route for General news from NDTV
-@app.route("/api/generalndtv", methods=["GET"])
-def fetch_latestndtv():
-    try:
-        with open("ndtv_general_news.csv", "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            articles = [row for row in reader]
-
-        if not articles:
-            return jsonify({"message": "No articles found."}), 404
-
-        return jsonify(articles)
+ARTICLE_QUERY_PARAMS = ("limit", "offset", "fields", "date", "sentiment", "category")
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def _non_negative_int(args, name):
+    value = args.get(name)
+    if value is None or value == "":
+        return None
+    if not value.isdigit():
+        raise ValueError(f"'{name}' must be a non-negative integer")
+    return int(value)
+
+
+def _limit(args):
+    # a page of zero rows is never what the caller meant
+    limit = _non_negative_int(args, "limit")
+    if limit == 0:
+        raise ValueError("'limit' must be a positive integer")
+    return limit
+
+
+def query_articles(entry, args, combined=False):
+    """Apply ?category=, ?date=, ?sentiment= filters, then ?fields= projection and ?limit=/?offset= paging.
+
+    ?category= only applies to the combined list (per-section rows carry no category).
+    Returns (rows, total matches before paging).
+    """
+    limit = _limit(args)
+    offset = _non_negative_int(args, "offset") or 0
+
+    fields = [f.strip() for f in args.get("fields", "").split(",") if f.strip()]
+    available = entry.rows[0].keys() if entry.rows else ()
+    unknown = [f for f in fields if f not in available]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+    categories = {c.strip().lower() for c in args.get("category", "").split(",") if c.strip()}
+    sentiments = {s.strip().lower() for s in args.get("sentiment", "").split(",") if s.strip()}
+    date = args.get("date", "").strip()
+    if categories and not combined:
+        raise ValueError("'category' is only supported on /api/allndtv")
+    unknown = sorted(c for c in categories if c not in CATEGORY_REGISTRY)
+    if unknown:
+        raise ValueError(f"Unknown category: {', '.join(unknown)}")
+    if date and not ISO_DATE.match(date):
+        raise ValueError("'date' must be a YYYY-MM-DD date")
+
+    indices = range(len(entry.rows))
+    if categories:
+        indices = [i for i in indices if entry.rows[i].get("category", "").lower() in categories]
+    if sentiments:
+        indices = [i for i in indices if entry.rows[i]["analysis_result"].lower() in sentiments]
+    if date:
+        dates = entry.dates
+        indices = [i for i in indices if dates[i] == date]
+
+    total = len(indices)
+    page = indices[offset:] if limit is None else indices[offset:offset + limit]
+    if fields:
+        rows = [{f: entry.rows[i][f] for f in fields} for i in page]
+    else:
+        rows = [entry.rows[i] for i in page]
+    return rows, total
+
+
+def payload_response(payload):
+    """Serve a cached body in the best encoding the client accepts, or 304 if its ETag still matches."""
+    encoding = request.accept_encodings.best_match(ENCODINGS, default="identity")
+    etag = payload.etag(encoding)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(payload.encoded(encoding), mimetype="application/json")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={API_MAX_AGE}, must-revalidate"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def articles_response(entry, combined=False):
+    if not entry.rows:
+        return jsonify({"message": "No articles found."}), 404
+
+    # plain requests get the whole cached payload (precompressed once per data version)
+    if not any(name in request.args for name in ARTICLE_QUERY_PARAMS):
+        return payload_response(entry.payload)
 
-    except FileNotFoundError:
-        return jsonify({"error": "CSV file not found."}), 500
-
-
-# Route of education articles from Ndtv
-@app.route("/api/edundtv", methods=["GET"])
-def fetch_edundtv():
     try:
-        with open("ndtv_education_news.csv", "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            articles = [row for row in reader]
-
-        if not articles:
-            return jsonify({"message": "No articles found."}), 404
-
-        return jsonify(articles)
+        rows, total = query_articles(entry, request.args, combined)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    except FileNotFoundError:
-        return jsonify({"error": "CSV file not found."}), 500
+    # filtered pages are small and varied, so they are compressed per request
+    response = payload_response(Payload(dumps(rows)))
+    response.headers["X-Total-Count"] = str(total)
+    offset = int(request.args.get("offset") or 0)
+    if offset + len(rows) < total:
+        response.headers["X-Next-Offset"] = str(offset + len(rows))
+    return response
 
 
-# Route of health from Ndtv
-@app.route("/api/healthndtv", methods=["GET"])
-def fetch_healthndtv():
+def category_articles_response(category):
     try:
-        with open("ndtv_health_news.csv", "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            articles = [row for row in reader]
-
-        if not articles:
-            return jsonify({"message": "No articles found."}), 404
-
-        return jsonify(articles)
-
-    except FileNotFoundError:
-        return jsonify({"error": "CSV file not found."}), 500
+        return articles_response(ARTICLE_CACHE.get(category))
 
+    except sqlite3.Error as e:
+        return jsonify({"error": f"Article store unavailable: {e}"}), 500
 
-# Route of cricket from Ndtv
-@app.route("/api/cricketndtv", methods=["GET"])
-def fetch_cricketndtv():
-    try:
-        with open("ndtv_cricket_news.csv", "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            articles = [row for row in reader]
 
-        if not articles:
-            return jsonify({"message": "No articles found."}), 404
+# One article route per registered section (e.g. /api/generalndtv, /api/edundtv)
+def _category_view(category):
+    def view():
+        return category_articles_response(category)
+    return view
 
-        return jsonify(articles)
 
-    except FileNotFoundError:
-        return jsonify({"error": "CSV file not found."}), 500
+for _name, _config in CATEGORY_REGISTRY.items():
+    app.add_url_rule(_config["route"], f"fetch_{_name}", _category_view(_name), methods=["GET"])
 
 
-# Route of science news from Ndtv
-@app.route("/api/sciencendtv", methods=["GET"])
-def fetch_sciencendtv():
+@app.route("/api/allndtv", methods=["GET"])
+def fetch_all_ndtv():
     try:
-        with open("ndtv_science_news.csv", "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            articles = [row for row in reader]
+        return articles_response(ARTICLE_CACHE.get(), combined=True)
 
-        if not articles:
-            return jsonify({"message": "No articles found."}), 404
+    except sqlite3.Error as e:
+        return jsonify({"error": f"Article store unavailable: {e}"}), 500
+    except Exception as e:
+        return jsonify({"error": f"An error occurred: {e}"}), 500
 
-        return jsonify(articles)
 
-    except FileNotFoundError:
-        return jsonify({"error": "CSV file not found."}), 500
+def trend_percentages(categories=None, start=None, end=None):
+    """Per-day Positive/Negative/Neutral percentages, oldest day first."""
+    # Daily counts are maintained by the store as articles arrive and get scored
+    sentiment_counts = storage.sentiment_trends(categories=categories, start=start, end=end)
 
+    # Convert to list format for the API with percentages
+    result = []
 
-# Route of world news from Ndtv
-@app.route("/api/worldndtv", methods=["GET"])
-def fetch_worldndtv():
-    try:
-        with open("ndtv_world_news.csv", "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            articles = [row for row in reader]
+    # Set minimum articles threshold for a date to be included
+    min_articles_threshold = 1
 
-        if not articles:
-            return jsonify({"message": "No articles found."}), 404
+    # Get all dates in sorted order
+    sorted_dates = sorted(sentiment_counts.keys())
 
-        return jsonify(articles)
+    for date in sorted_dates:
+        counts = sentiment_counts[date]
 
-    except FileNotFoundError:
-        return jsonify({"error": "CSV file not found."}), 500
+        # Calculate total articles for this date
+        total = counts['Positive'] + counts['Negative'] + counts['Neutral']
 
+        # Skip dates with insufficient articles
+        if total < min_articles_threshold:
+            continue
 
-# Route of entertainment news from Ndtv
-@app.route("/api/enterndtv", methods=["GET"])
-def fetch_enterndtv():
-    try:
-        with open("ndtv_entertainment_news.csv", "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            articles = [row for row in reader]
+        # Calculate percentages
+        positive_pct = round((counts['Positive'] / total) * 100, 1)
+        negative_pct = round((counts['Negative'] / total) * 100, 1)
+        neutral_pct = round((counts['Neutral'] / total) * 100, 1)
 
-        if not articles:
-            return jsonify({"message": "No articles found."}), 404
+        # Ensure total is exactly 100% (handle rounding errors)
+        total_pct = positive_pct + negative_pct + neutral_pct
+        if total_pct != 100:
+            # Adjust the largest value to make total exactly 100%
+            diff = 100 - total_pct
+            if positive_pct >= negative_pct and positive_pct >= neutral_pct:
+                positive_pct += diff
+            elif negative_pct >= positive_pct and negative_pct >= neutral_pct:
+                negative_pct += diff
+            else:
+                neutral_pct += diff
 
-        return jsonify(articles)
+        result.append({
+            'date': date,
+            'positive': positive_pct,
+            'negative': negative_pct,
+            'neutral': neutral_pct,
+            'total_articles': total  # Include total for reference
+        })
 
-    except FileNotFoundError:
-        return jsonify({"error": "CSV file not found."}), 500
+    return result
 
 
-@app.route("/api/allndtv", methods=["GET"])
-def fetch_all_ndtv():
+@app.route("/api/sentiment-trends", methods=["GET"])
+def fetch_sentiment_trends():
+    # Optional ?category=world,health and ?start= / ?end= (YYYY-MM-DD) narrow the trend, checked
+    # like the other filterable routes; a trend spans days and sentiments, so ?date= / ?sentiment= don't apply
     try:
-        # Open the combined CSV file
-        with open("ndtv_all_news.csv", "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            all_articles = [row for row in reader]
+        filters = store_filters({k: v for k, v in request.args.items() if k not in ("date", "sentiment")})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    categories, start, end = filters["categories"], filters["start"], filters["end"]
 
-        if not all_articles:
+    try:
+        # the percentages are rebuilt only when the store changes, and their compressed copies with them
+        key = ("trends", tuple(categories), start, end)
+        payload = ARTICLE_CACHE.payload(key, lambda: trend_percentages(categories, start, end))
+        if payload.body == b"[]":
             return jsonify({"message": "No articles found."}), 404
+        return payload_response(payload)
 
-        return jsonify(all_articles)
-
-    except FileNotFoundError:
-        return jsonify({"error": "Combined CSV file not found."}), 500
+    except sqlite3.Error as e:
+        return jsonify({"error": f"Article store unavailable: {e}"}), 500
     except Exception as e:
         return jsonify({"error": f"An error occurred: {e}"}), 500
 
 
-@app.route("/api/sentiment-trends", methods=["GET"])
-def fetch_sentiment_trends():
+def store_filters(args):
+    """?category=, ?sentiment= (comma lists), ?date= or ?start= / ?end= (YYYY-MM-DD) as storage filter kwargs."""
+    filters = {
+        "categories": [c.strip().lower() for c in args.get("category", "").split(",") if c.strip()],
+        "sentiments": [s.strip().lower() for s in args.get("sentiment", "").split(",") if s.strip()],
+    }
+    unknown = [c for c in filters["categories"] if c not in CATEGORY_REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown category: {', '.join(unknown)}")
+    for name in ("date", "start", "end"):
+        value = args.get(name, "").strip() or None
+        if value and not ISO_DATE.match(value):
+            raise ValueError(f"'{name}' must be a YYYY-MM-DD date")
+        filters[name] = value
+    return filters
+
+
+# Bulk export: one JSON object per line, streamed straight from the store
+@app.route("/api/export", methods=["GET"])
+def export_articles():
     try:
-        # Open the combined CSV file
-        df = pd.read_csv("ndtv_all_news.csv", encoding="utf-8")
+        filters = store_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        if df.empty:
-            return jsonify({"message": "No articles found."}), 404
+    def generate():
+        try:
+            for row in storage.iter_articles(**filters):
+                yield json.dumps(row, sort_keys=True, separators=(",", ":")) + "\n"
+        except sqlite3.Error as e:
+            # headers are already sent; end the stream with an error record instead
+            yield json.dumps({"error": f"Article store unavailable: {e}"}) + "\n"
 
-        print(f"Total articles in ndtv_all_news.csv: {len(df)}")
-        print(f"Columns in CSV: {df.columns.tolist()}")
-
-        # Check for missing values in key columns
-        print(f"Missing values in datetime_posted: {df['datetime_posted'].isna().sum()}")
-        print(f"Missing values in analysis_result: {df['analysis_result'].isna().sum()}")
-
-        # Print sample of datetime values
-        print("Sample datetime values:")
-        for dt_str in df['datetime_posted'].dropna().sample(min(5, len(df))).tolist():
-            print(f"  {dt_str}")
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
 
-        # Preprocess datetime strings to handle IST timezone
-        def clean_datetime(dt_str):
-            if pd.isna(dt_str):
-                return dt_str
 
-            # Convert to string if not already
-            dt_str = str(dt_str)
+SEARCH_MAX_LIMIT = 100
 
-            # Remove IST and other timezone indicators
-            if "IST" in dt_str:
-                dt_str = dt_str.replace("IST", "").strip()
-
-            # Handle common prefixes in NDTV dates
-            prefixes = ["Updated:", "Published On:", "Posted on:"]
-            for prefix in prefixes:
-                if dt_str.startswith(prefix):
-                    dt_str = dt_str[len(prefix):].strip()
-
-            return dt_str
-
-        # Clean datetime strings before parsing
-        df['cleaned_datetime'] = df['datetime_posted'].apply(clean_datetime)
-
-        # Try to parse dates with multiple formats
-        def parse_date_with_formats(date_str):
-            if pd.isna(date_str):
-                return None
-
-            formats = [
-                '%B %d, %Y %I:%M %p',  # May 03, 2025 04:10 am
-                '%B %d, %Y',           # May 03, 2025
-                '%d %B %Y',            # 03 May 2025
-                '%Y-%m-%d',            # 2025-05-03
-                '%d/%m/%Y',            # 03/05/2025
-                '%m/%d/%Y'             # 05/03/2025
-            ]
-
-            for fmt in formats:
-                try:
-                    return pd.to_datetime(date_str, format=fmt).date()
-                except:
-                    continue
-
-            # If all formats fail, try pandas default parser
-            try:
-                return pd.to_datetime(date_str).date()
-            except:
-                return None
-
-        # Apply custom date parsing
-        df['date'] = df['cleaned_datetime'].apply(parse_date_with_formats)
-
-        # Count valid dates
-        valid_dates = df['date'].notna().sum()
-        print(f"Successfully parsed {valid_dates} dates out of {len(df)} articles ({valid_dates/len(df)*100:.1f}%)")
-
-        # Group by date and sentiment, count articles
-        sentiment_counts = defaultdict(lambda: {'Positive': 0, 'Negative': 0, 'Neutral': 0})
-
-        # Count of articles by sentiment
-        sentiment_totals = {'Positive': 0, 'Negative': 0, 'Neutral': 0}
-
-        for _, row in df.iterrows():
-            # Skip rows where date parsing failed
-            if pd.isna(row['date']):
-                continue
-
-            date_str = str(row['date'])
-            sentiment = row['analysis_result']
-
-            # Handle missing or unknown sentiment
-            if pd.isna(sentiment) or sentiment == '' or sentiment == 'Unknown':
-                sentiment = 'Neutral'
-
-            # Ensure sentiment is one of our expected values
-            if sentiment not in ['Positive', 'Negative', 'Neutral']:
-                sentiment = 'Neutral'
-
-            sentiment_counts[date_str][sentiment] += 1
-            sentiment_totals[sentiment] += 1
-
-        # Print overall sentiment distribution
-        total_processed = sum(sentiment_totals.values())
-        print(f"\nOverall sentiment distribution (from {total_processed} articles with valid dates):")
-        for sentiment, count in sentiment_totals.items():
-            percentage = (count / total_processed * 100) if total_processed > 0 else 0
-            print(f"{sentiment}: {count} articles ({percentage:.1f}%)")
-
-        # Convert to list format for the API with percentages
-        result = []
-
-        # Set minimum articles threshold for a date to be included
-        min_articles_threshold = 1
-
-        # Get all dates in sorted order
-        sorted_dates = sorted(sentiment_counts.keys())
-
-        for date in sorted_dates:
-            counts = sentiment_counts[date]
-
-            # Calculate total articles for this date
-            total = counts['Positive'] + counts['Negative'] + counts['Neutral']
-
-            # Skip dates with insufficient articles
-            if total < min_articles_threshold:
-                print(f"Skipping date {date} with only {total} articles (below threshold of {min_articles_threshold})")
-                continue
-
-            # Calculate percentages
-            positive_pct = round((counts['Positive'] / total) * 100, 1)
-            negative_pct = round((counts['Negative'] / total) * 100, 1)
-            neutral_pct = round((counts['Neutral'] / total) * 100, 1)
-
-            # Ensure total is exactly 100% (handle rounding errors)
-            total_pct = positive_pct + negative_pct + neutral_pct
-            if total_pct != 100:
-                # Adjust the largest value to make total exactly 100%
-                diff = 100 - total_pct
-                if positive_pct >= negative_pct and positive_pct >= neutral_pct:
-                    positive_pct += diff
-                elif negative_pct >= positive_pct and negative_pct >= neutral_pct:
-                    negative_pct += diff
-                else:
-                    neutral_pct += diff
-
-            # Print debug info for this date
-            print(f"Date: {date}, Total: {total}, Positive: {positive_pct}%, Negative: {negative_pct}%, Neutral: {neutral_pct}%")
-
-            result.append({
-                'date': date,
-                'positive': positive_pct,
-                'negative': negative_pct,
-                'neutral': neutral_pct,
-                'total_articles': total  # Include total for reference
-            })
-
-        return jsonify(result)
-
-    except FileNotFoundError:
-        return jsonify({"error": "Combined CSV file not found."}), 500
-    except Exception as e:
-        return jsonify({"error": f"An error occurred: {e}"}), 500
+
+# Full-text search: ?q= plus the export filters, ranked by relevance, paged with ?limit= / ?offset=
+@app.route("/api/search", methods=["GET"])
+def search_articles():
+    text = request.args.get("q", "").strip()
+    if not text:
+        return jsonify({"error": "'q' is required"}), 400
+    try:
+        filters = store_filters(request.args)
+        limit = _limit(request.args)
+        limit = min(20 if limit is None else limit, SEARCH_MAX_LIMIT)
+        offset = _non_negative_int(request.args, "offset") or 0
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        started = time.perf_counter()
+        hits, total = storage.search_articles(text, limit=limit, offset=offset, **filters)
+        took_ms = round((time.perf_counter() - started) * 1000, 2)
+    except sqlite3.Error as e:
+        return jsonify({"error": f"Article store unavailable: {e}"}), 500
+
+    response = jsonify({"query": text, "total": total, "took_ms": took_ms, "hits": hits})
+    response.headers["X-Total-Count"] = str(total)
+    if offset + len(hits) < total:
+        response.headers["X-Next-Offset"] = str(offset + len(hits))
+    return response
+
+
+# Prometheus scrape target: counters and latency histograms for the crawl and each cycle stage
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def _totals(metric, label):
+    totals = {}
+    for key, value in metric.snapshot().items():
+        name = key[metric.labelnames.index(label)]
+        totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+# Current stage, last cycle's stage timings and per-category crawl report, plus running totals
+@app.route("/api/pipeline-status", methods=["GET"])
+def pipeline_status():
+    status = pipeline.pipeline_status()
+    status["stream"] = pipeline.stream_status()
+    status["schedule"] = pipeline.schedule_status()
+    status["totals"] = {
+        "http_status": _totals(metrics.HTTP_REQUESTS, "status"),
+        "http_retries": sum(metrics.HTTP_RETRIES.snapshot().values()),
+        "http_errors": _totals(metrics.HTTP_ERRORS, "host"),
+        "articles_scraped": _totals(metrics.ARTICLES_SCRAPED, "category"),
+        "rows_written": _totals(metrics.ROWS_WRITTEN, "category"),
+        "failures": _totals(metrics.SCRAPE_FAILURES, "kind"),
+        "host_rates": _totals(metrics.HOST_RATE, "host"),
+    }
+    return jsonify(status)
 
 
 # Run the Flask app
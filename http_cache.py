@@ -0,0 +1,117 @@
+# http_cache.py
+# On-disk cache of fetched pages: validators (ETag / Last-Modified), a gzip'd body and its hash.
+# The scraper uses it to send conditional requests and to skip parsing pages that did not change.
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+HTTP_CACHE_PATH = os.environ.get("HTTP_CACHE_PATH", "http_cache.db")
+# entries not requested for this long are dropped by prune(); listings are re-checked every
+# cycle and stay, while article pages (fetched once, then known to the link index) age out
+HTTP_CACHE_MAX_AGE = float(os.environ.get("HTTP_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT NOT NULL,
+    body BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    checked_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_checked ON responses(checked_at);
+"""
+
+
+def body_hash(content):
+    return hashlib.sha1(content).hexdigest()
+
+
+class CachedPage:
+    def __init__(self, url, etag, last_modified, digest, body):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body_hash = digest
+        self._body = body
+
+    @property
+    def content(self):
+        return gzip.decompress(self._body)
+
+
+class HttpCache:
+    """One SQLite file of cached responses; safe to share between fetch threads."""
+
+    def __init__(self, path=HTTP_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                if not self._ready:
+                    conn.executescript(SCHEMA)
+                    self._ready = True
+        return conn
+
+    def get(self, url):
+        row = self._connection().execute(
+            "SELECT url, etag, last_modified, body_hash, body FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        return CachedPage(*row) if row else None
+
+    def conditional_headers(self, page):
+        headers = {}
+        if page is not None:
+            if page.etag:
+                headers["If-None-Match"] = page.etag
+            if page.last_modified:
+                headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    def touch(self, url):
+        conn = self._connection()
+        with conn:
+            conn.execute("UPDATE responses SET checked_at = ? WHERE url = ?", (time.time(), url))
+
+    def store(self, url, response, previous=None):
+        """Save a 200 response; returns False when its body is identical to the cached one."""
+        digest = body_hash(response.content)
+        now = time.time()
+        conn = self._connection()
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        with conn:
+            if previous is not None and previous.body_hash == digest:
+                # same bytes: keep the stored body, only refresh the validators
+                conn.execute(
+                    "UPDATE responses SET etag = ?, last_modified = ?, checked_at = ? WHERE url = ?",
+                    (etag, last_modified, now, url),
+                )
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, body_hash, body, fetched_at, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, digest, gzip.compress(response.content, 6), now, now),
+            )
+        return True
+
+    def prune(self, max_age=HTTP_CACHE_MAX_AGE):
+        """Delete entries last requested more than max_age seconds ago; returns how many."""
+        conn = self._connection()
+        with conn:
+            return conn.execute("DELETE FROM responses WHERE checked_at < ?", (time.time() - max_age,)).rowcount
+
+
+# an empty HTTP_CACHE_PATH turns the cache off
+HTTP_CACHE = HttpCache() if HTTP_CACHE_PATH else None
@@ -0,0 +1,194 @@
+# metrics.py
+# In-process counters and latency histograms for the scrape / analyze pipeline, rendered in the
+# Prometheus text exposition format by the API's /metrics route. Recording is thread-safe and cheap
+# (one lock per metric), so the fetch workers can call it on every request.
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# seconds; covers a fast local parse up to a slow article fetch or a full sentiment pass
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket (non-cumulative) counts, then sum and count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_samples(self, items):
+        lines = []
+        bounds = self.buckets + (float("inf"),)
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(bounds, counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return {key: {"count": state[2], "sum": state[1]} for key, state in self._values.items()}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name, documentation, labelnames=()):
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# ---------------------------
+# Pipeline metrics
+# ---------------------------
+HTTP_REQUESTS = counter("news_http_requests_total", "HTTP responses received, by host and status code.",
+                        ("host", "status"))
+HTTP_ERRORS = counter("news_http_errors_total", "Requests that failed without a response (timeouts, connection errors).",
+                      ("host",))
+HTTP_RETRIES = counter("news_http_retries_total", "Retries made by the session's Retry adapter, by host and the status that caused them.",
+                       ("host", "status"))
+HTTP_THROTTLED = counter("news_http_throttled_total", "429 / 503 answers that made the rate limiter back off and retry.",
+                         ("host",))
+HOST_RATE = gauge("news_host_rate", "Requests per second the adaptive limiter currently allows, per host.", ("host",))
+HTTP_LATENCY = histogram("news_http_request_seconds", "Time from sending a request to receiving the response, retries included.",
+                         ("host",))
+
+SCRAPE_STAGE = histogram("news_scrape_stage_seconds", "Time spent in each crawl stage, per category.",
+                         ("category", "stage"))
+ARTICLES_SCRAPED = counter("news_articles_scraped_total", "Article pages fetched and parsed.", ("category",))
+SCRAPE_FAILURES = counter("news_scrape_failures_total", "Listing or article pages that could not be fetched or parsed.",
+                          ("category", "kind"))
+ROWS_WRITTEN = counter("news_rows_written_total", "New article rows inserted into the store.", ("category",))
+
+STREAM_ITEMS = counter("news_stream_items_total", "Articles through each step of the streaming pipeline.", ("stage",))
+STREAM_QUEUE_DEPTH = gauge("news_stream_queue_depth", "Articles waiting in front of each streaming stage.", ("stage",))
+STREAM_FRESHNESS = histogram("news_stream_freshness_seconds", "Time from an article being scraped to it being served by the API.")
+
+PIPELINE_STAGE = histogram("news_pipeline_stage_seconds", "Time spent in each stage of a scrape cycle.", ("stage",))
+CYCLES = counter("news_pipeline_cycles_total", "Completed scrape cycles, by outcome.", ("status",))
+POLL_INTERVAL = gauge("news_poll_interval_seconds", "Current adaptive polling interval per category.", ("category",))
+LAST_CYCLE_END = gauge("news_pipeline_last_cycle_timestamp_seconds", "Unix time the last scrape cycle finished.")
+
+
+def render():
+    return REGISTRY.render()
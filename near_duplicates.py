@@ -0,0 +1,125 @@
+# near_duplicates.py
+# Clusters near-identical stories (e.g. the same report under "latest" and "world") with
+# word shingles, MinHash signatures and LSH banding. Each new article costs one indexed
+# lookup per band, so a pass stays cheap however large the archive grows.
+import argparse
+import hashlib
+import os
+import re
+import time
+import zlib
+
+import numpy as np
+
+import storage
+
+NUM_PERM = 64
+BANDS = 16                      # 16 bands x 4 rows: pairs above ~0.5 Jaccard become candidates
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+# shorter bodies (empty pages, placeholders) carry too little text to call anything a duplicate
+MIN_WORDS = 20
+# candidates whose estimated Jaccard similarity reaches this are marked as duplicates
+DUPLICATE_THRESHOLD = float(os.environ.get("DUPLICATE_THRESHOLD", "0.8"))
+
+TOKEN_RE = re.compile(r"\w+")
+
+# universal hashing h(x) = (a*x + b) mod p over 32-bit shingle hashes; a, b are fixed so
+# signatures stay comparable across runs. a*x + b stays below 2**64 for these ranges.
+_PRIME = np.uint64(4294967311)
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(1, 2**32 - 2, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text):
+    """Hashes of the overlapping SHINGLE_SIZE-word windows in text (empty if text is under MIN_WORDS)."""
+    words = TOKEN_RE.findall((text or "").lower())
+    if len(words) < MIN_WORDS:
+        return np.empty(0, dtype=np.uint64)
+    grams = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(hashes):
+    """NUM_PERM-long MinHash signature, or None when there are no shingles."""
+    if hashes.size == 0:
+        return None
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0)
+
+
+def band_buckets(signature):
+    """(band, bucket) keys: each band's rows hashed to a signed 64-bit int for SQLite."""
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS].tobytes()
+        bucket = int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True)
+        keys.append((band, bucket))
+    return keys
+
+
+def similarity(a, b):
+    # share of agreeing signature slots estimates the Jaccard similarity of the shingle sets
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def detect_new(threshold=DUPLICATE_THRESHOLD, batch_size=5000):
+    """Run the near-duplicate pass over articles stored since the last pass. Returns (processed, duplicates)."""
+    processed = duplicates_found = 0
+    while True:
+        pending = storage.fetch_unhashed(limit=batch_size)
+        if not pending:
+            return processed, duplicates_found
+
+        # articles in this batch are matched against each other as well as the stored index
+        batch_index = {}
+        batch_signatures = {}
+        signatures, bands, duplicates = [], [], []
+        for rowid, content in pending:
+            # headlines are left out: placeholder headlines ("No headline") are shared by unrelated stories
+            signature = minhash(shingles(content))
+            if signature is None:
+                continue
+            keys = band_buckets(signature)
+
+            candidates = storage.lsh_candidates(keys)
+            for key in keys:
+                candidates.update(batch_index.get(key, ()))
+            stored = storage.get_minhashes(candidates - batch_signatures.keys())
+            best, best_score = None, threshold
+            for other in sorted(candidates):
+                if other in batch_signatures:
+                    other_signature, other_root = batch_signatures[other]
+                else:
+                    blob, other_root = stored[other]
+                    other_signature = np.frombuffer(blob, dtype=np.uint64)
+                score = similarity(signature, other_signature)
+                if score >= best_score:
+                    best, best_score = (other_root or other), score
+                    if score == 1.0:
+                        break
+
+            # clusters point at their earliest article, so chains never form
+            root = best if best is not None and best < rowid else None
+            if root is not None:
+                duplicates.append((rowid, root))
+            batch_signatures[rowid] = (signature, root)
+            signatures.append((rowid, signature.tobytes()))
+            for band, bucket in keys:
+                bands.append((band, bucket, rowid))
+                batch_index.setdefault((band, bucket), []).append(rowid)
+
+        storage.save_minhashes(signatures, bands, duplicates, pending[-1][0])
+        processed += len(pending)
+        duplicates_found += len(duplicates)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mark near-duplicate articles in the store.")
+    parser.add_argument("--threshold", type=float, default=DUPLICATE_THRESHOLD,
+                        help="minimum estimated Jaccard similarity for a duplicate")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    processed, found = detect_new(args.threshold)
+    print(f"Checked {processed} articles, marked {found} near-duplicates in {time.perf_counter() - started:.2f}s")
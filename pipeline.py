@@ -0,0 +1,415 @@
+# pipeline.py
+# Explicit entry point for a scrape cycle: crawl -> near-duplicates -> sentiment -> combined export,
+# and the scheduler that polls each category on its own adaptive timer.
+# Nothing here runs at import time, so the API process can import it cheaply.
+import argparse
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime as dt
+
+from Scraping import crawl_category, combine_category_csvs, mark_seen
+from categories import CATEGORY_NAMES, get_category
+from http_cache import HTTP_CACHE
+from metrics import CYCLES, LAST_CYCLE_END, PIPELINE_STAGE, POLL_INTERVAL
+from near_duplicates import detect_new
+from sentiment_analysis import sentiment_analysis
+from storage import data_version
+from streaming import ArticleStream
+
+
+# Category crawls run side by side; each gets its own deadline so one slow
+# section can't hold up the rest of the cycle
+CATEGORY_TIMEOUT = float(os.environ.get("CATEGORY_TIMEOUT", "900"))
+# starting poll interval for every category; each then adapts between its bounds
+CYCLE_INTERVAL = float(os.environ.get("CYCLE_INTERVAL", "3600"))
+POLL_MIN_INTERVAL = float(os.environ.get("POLL_MIN_INTERVAL", "300"))
+POLL_MAX_INTERVAL = float(os.environ.get("POLL_MAX_INTERVAL", "10800"))
+# a category is polled about as often as it takes to gather this many new articles
+POLL_TARGET_YIELD = float(os.environ.get("POLL_TARGET_YIELD", "3"))
+# new articles are scored, stored and published while the crawl runs (PIPELINE_STREAMING=0 for batch only)
+STREAMING = os.environ.get("PIPELINE_STREAMING", "1") != "0"
+
+last_cycle_report = {}
+# cycles in progress by id, and each category's last finished cycle (served by /api/pipeline-status);
+# cycles for different categories overlap, so all of it is read and written under _status_lock
+_active_cycles = {}
+_finished_cycles = {}
+_cycle_count = 0
+_cycle_ids = itertools.count(1)
+
+# each category's latest crawl; one that overran its deadline keeps running in the background
+_crawls = {}
+_crawls_lock = threading.Lock()
+
+_stream = None
+_stream_lock = threading.Lock()
+# crawls of different categories may overlap; the passes over the whole store after them may not
+_post_crawl_lock = threading.Lock()
+_status_lock = threading.Lock()
+
+
+def get_stream(publish=None):
+    """The process-wide article stream, started on first use.
+
+    publish(categories) is only taken by the call that starts it: the API process passes one to
+    rebuild its response cache as rows arrive; anywhere else nothing reads that cache.
+    """
+    global _stream
+    with _stream_lock:
+        if _stream is None:
+            _stream = ArticleStream(publish=publish, on_store=mark_seen).start()
+    return _stream
+
+
+def stream_status():
+    return _stream.status() if _stream is not None else None
+
+
+def pipeline_status():
+    """Copy of the cycle bookkeeping: state is "running" while any cycle is, else "idle"."""
+    with _status_lock:
+        running = [dict(cycle, stages=dict(cycle["stages"])) for cycle in _active_cycles.values()]
+        finished = {name: dict(cycle, stages=dict(cycle["stages"])) for name, cycle in _finished_cycles.items()}
+        categories = {name: dict(result) for name, result in last_cycle_report.items()}
+        cycles = _cycle_count
+    return {"state": "running" if running else "idle", "cycles": cycles, "running": running,
+            "last_cycles": finished, "categories": categories}
+
+
+def _begin_cycle(categories):
+    cycle = {"id": next(_cycle_ids), "categories": list(categories or CATEGORY_NAMES), "state": "starting",
+             "started_at": dt.now().isoformat(timespec="seconds"), "stages": {}}
+    with _status_lock:
+        _active_cycles[cycle["id"]] = cycle
+    return cycle
+
+
+def _end_cycle(cycle, error=None):
+    global _cycle_count
+    with _status_lock:
+        del _active_cycles[cycle["id"]]
+        cycle.update(state="error" if error else "done", error=error,
+                     finished_at=dt.now().isoformat(timespec="seconds"))
+        for name in cycle["categories"]:
+            _finished_cycles[name] = cycle
+        _cycle_count += 1
+
+
+@contextmanager
+def _stage(name, cycle):
+    with _status_lock:
+        cycle["state"] = name
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        PIPELINE_STAGE.observe(seconds, stage=name)
+        with _status_lock:
+            cycle["stages"][name] = round(seconds, 3)
+
+
+def _timed_scrape(category, sink=None):
+    started = time.monotonic()
+    try:
+        return crawl_category(category, sink), time.monotonic() - started, None
+    except Exception as e:
+        return None, time.monotonic() - started, e
+
+
+def crawl_future(name):
+    """The future of the category's latest crawl (None if it was never crawled)."""
+    with _crawls_lock:
+        return _crawls.get(name)
+
+
+def scrape_categories_parallel(timeout=CATEGORY_TIMEOUT, categories=None, sink=None):
+    names = [name for name in CATEGORY_NAMES if categories is None or name in categories]
+    report = {}
+    with _crawls_lock:
+        # never start a second crawl of a category whose previous one is still running
+        for name in names:
+            previous = _crawls.get(name)
+            if previous is not None and not previous.done():
+                report[name] = {"status": "busy", "articles": 0, "seconds": 0.0}
+        names = [name for name in names if name not in report]
+        pool = ThreadPoolExecutor(max_workers=max(1, len(names)), thread_name_prefix="category")
+        started = time.monotonic()
+        futures = [(name, pool.submit(_timed_scrape, name, sink)) for name in names]
+        _crawls.update(futures)
+
+    for name, future in futures:
+        remaining = max(0.0, started + timeout - time.monotonic())
+        try:
+            data, seconds, error = future.result(timeout=remaining)
+        except FutureTimeout:
+            report[name] = {"status": "timeout", "articles": 0, "seconds": round(time.monotonic() - started, 2)}
+            continue
+        if error is not None:
+            report[name] = {"status": "error", "articles": 0, "seconds": round(seconds, 2), "error": str(error)}
+        else:
+            report[name] = {"status": "ok", "articles": len(data) if data else 0, "seconds": round(seconds, 2)}
+
+    # don't wait on crawls that overran their deadline; they finish in the background
+    pool.shutdown(wait=False)
+
+    for name, result in report.items():
+        line = f"  {name:<14} {result['status']:<8} {result['articles']:>4} articles  {result['seconds']:>7.2f}s"
+        if "error" in result:
+            line += f"  ({result['error']})"
+        print(line)
+    return report
+
+
+def run_cycle(categories=None, timeout=CATEGORY_TIMEOUT, on_complete=None, streaming=STREAMING):
+    """Run one full scrape cycle and return the per-category crawl report.
+
+    on_complete runs only when the cycle changed the store.
+    """
+    global last_cycle_report
+    print("Starting scraping at", dt.now().strftime("%Y-%m-%d %H:%M:%S"))
+    cycle = _begin_cycle(categories)
+    error = None
+    version_before = data_version()
+
+    try:
+        stream = get_stream() if streaming else None
+        stored_before = stream.status()["stored"] if stream else 0
+        with _stage("crawl", cycle):
+            report = scrape_categories_parallel(timeout, categories, stream.submit if stream else None)
+        # cycles for different categories can overlap: keep each category's latest result
+        with _status_lock:
+            last_cycle_report = {**last_cycle_report, **report}
+
+        print("All scraping completed at", dt.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+        if stream is not None:
+            # articles were already scored and published as they arrived; wait for the tail
+            with _stage("stream_drain", cycle):
+                stream.flush()
+            print(f"Streamed {stream.status()['stored'] - stored_before} new articles to the store")
+
+        with _post_crawl_lock:
+            # cluster the new articles with stories already stored under another URL or section
+            with _stage("near_duplicates", cycle):
+                checked, duplicates = detect_new()
+            print(f"Near-duplicate check: {checked} new articles, {duplicates} duplicates")
+
+            # Run sentiment analysis (only new or changed articles are scored; streamed ones already are)
+            with _stage("sentiment", cycle):
+                sentiment_analysis(categories=categories)
+
+            # append the newly scored articles to the combined csv
+            with _stage("combine", cycle):
+                combine_category_csvs()
+
+            # keep the response cache to pages that are still being requested
+            if HTTP_CACHE is not None:
+                with _stage("cache_prune", cycle):
+                    pruned = HTTP_CACHE.prune()
+                if pruned:
+                    print(f"Pruned {pruned} stale pages from the response cache")
+
+            if on_complete is not None and data_version() != version_before:
+                with _stage("publish", cycle):
+                    on_complete()
+    except Exception as e:
+        CYCLES.inc(status="error")
+        error = str(e)
+        raise
+    else:
+        CYCLES.inc(status="ok")
+    finally:
+        LAST_CYCLE_END.set(time.time())
+        _end_cycle(cycle, error)
+    return report
+
+
+# ---------------------------
+# Adaptive polling: every category on its own timer
+# ---------------------------
+class CategoryPoller:
+    """Polling interval for one category, steered by how many new articles its polls find.
+
+    The smoothed yield (new articles per second between polls) sets the interval to roughly
+    POLL_TARGET_YIELD articles' worth; polls that find nothing stretch it by half. The
+    result always stays within the category's bounds.
+    """
+
+    SMOOTHING = 0.5
+    IDLE_GROWTH = 1.5
+
+    def __init__(self, name, interval=CYCLE_INTERVAL, min_interval=None, max_interval=None):
+        bounds = get_category(name).get("poll") or {}
+        self.name = name
+        self.min_interval = float(min_interval or bounds.get("min", POLL_MIN_INTERVAL))
+        self.max_interval = max(self.min_interval, float(max_interval or bounds.get("max", POLL_MAX_INTERVAL)))
+        self.interval = self._clamp(interval)
+        self.rate = None
+        self.last_poll = None
+        self.last_yield = None
+        self.next_due = 0.0
+
+    def _clamp(self, interval):
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def record(self, new_articles, polled_at):
+        """new_articles is None when the poll failed or timed out; the interval is then left as is."""
+        # the first poll after start-up has no known window (and finds the backlog), so it only sets the baseline
+        if self.last_poll is not None and new_articles is not None:
+            sample = new_articles / max(polled_at - self.last_poll, 1.0)
+            self.rate = sample if self.rate is None else self.SMOOTHING * sample + (1 - self.SMOOTHING) * self.rate
+            if new_articles == 0:
+                self.interval = self._clamp(self.interval * self.IDLE_GROWTH)
+            elif self.rate > 0:
+                self.interval = self._clamp(POLL_TARGET_YIELD / self.rate)
+        self.last_poll = polled_at
+        self.last_yield = new_articles
+        self.next_due = polled_at + self.interval
+        POLL_INTERVAL.set(round(self.interval, 1), category=self.name)
+
+    def status(self, now):
+        return {
+            "interval": round(self.interval, 1),
+            "bounds": [self.min_interval, self.max_interval],
+            "next_poll_in": round(max(0.0, self.next_due - now), 1),
+            "last_yield": self.last_yield,
+        }
+
+
+class PollScheduler:
+    """Starts a cycle for each category as it comes due, on its own worker thread, so a long
+    crawl of one category never holds back another's timer.
+
+    Crawls overlap freely; the store-wide passes after them take turns (see run_cycle). A
+    category is not polled again while its previous cycle, or a crawl of it that overran
+    its deadline, is still running.
+    """
+
+    def __init__(self, categories=None, interval=CYCLE_INTERVAL, timeout=CATEGORY_TIMEOUT,
+                 on_cycle_complete=None, streaming=STREAMING):
+        names = [name for name in CATEGORY_NAMES if categories is None or name in categories]
+        self.pollers = {name: CategoryPoller(name, interval) for name in names}
+        self.timeout = timeout
+        self.on_cycle_complete = on_cycle_complete
+        self.streaming = streaming
+        self._lock = threading.Lock()
+        self._running = set()
+        # set whenever a cycle finishes, so the loop re-reads the timers
+        self._wake = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(names)), thread_name_prefix="poll")
+
+    def _claim_due(self):
+        now = time.monotonic()
+        with self._lock:
+            names = [name for name, poller in self.pollers.items()
+                     if poller.next_due <= now and name not in self._running]
+            self._running.update(names)
+        return names, now
+
+    def _poll(self, names, started):
+        try:
+            report = run_cycle(names, self.timeout, on_complete=self.on_cycle_complete, streaming=self.streaming)
+        except Exception as e:
+            print(f"Error during scraping: {e}")
+            report = {}
+        overrunning = []
+        with self._lock:
+            for name in names:
+                result = report.get(name, {})
+                self.pollers[name].record(result["articles"] if result.get("status") == "ok" else None, started)
+                crawl = crawl_future(name)
+                if crawl is not None and not crawl.done():
+                    # the crawl overran its deadline and is still fetching: hold the category until it ends
+                    overrunning.append((name, crawl))
+                else:
+                    self._running.discard(name)
+            upcoming = heapq.nsmallest(3, self.pollers.values(), key=lambda poller: poller.next_due)
+        for name, crawl in overrunning:
+            # registered outside the lock: the callback runs right here if the crawl has just finished
+            crawl.add_done_callback(lambda _, name=name: self._crawl_finished(name))
+        now = time.monotonic()
+        print("Next polls: " + ", ".join(f"{p.name} in {max(0.0, p.next_due - now):.0f}s" for p in upcoming) + "\n")
+        self._wake.set()
+        return report
+
+    def _crawl_finished(self, name):
+        with self._lock:
+            self._running.discard(name)
+        self._wake.set()
+
+    def run_due(self):
+        """Run one cycle for all due categories in the calling thread; returns its report."""
+        names, started = self._claim_due()
+        return self._poll(names, started) if names else {}
+
+    def dispatch_due(self):
+        """Start a cycle per due category on the worker threads; returns the names started."""
+        names, started = self._claim_due()
+        for name in names:
+            self._pool.submit(self._poll, [name], started)
+        return names
+
+    def sleep_time(self):
+        """Seconds until the next idle category is due (None while every category is being crawled)."""
+        with self._lock:
+            idle = [poller.next_due for name, poller in self.pollers.items() if name not in self._running]
+        return max(0.0, min(idle) - time.monotonic()) if idle else None
+
+    def status(self):
+        now = time.monotonic()
+        with self._lock:
+            statuses = {name: poller.status(now) for name, poller in self.pollers.items()}
+            for name in self._running:
+                statuses[name]["running"] = True
+        return statuses
+
+    def run_forever(self):
+        while True:
+            self._wake.clear()
+            self.dispatch_due()
+            self._wake.wait(self.sleep_time())
+
+
+scheduler = None
+
+
+def schedule_status():
+    return scheduler.status() if scheduler is not None else None
+
+
+def run_forever(interval=CYCLE_INTERVAL, on_cycle_complete=None, categories=None, streaming=STREAMING,
+                stream_publish=None):
+    global scheduler
+    if streaming:
+        get_stream(stream_publish)
+    scheduler = PollScheduler(categories, interval, on_cycle_complete=on_cycle_complete, streaming=streaming)
+    scheduler.run_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape NDTV categories, score sentiment and export the combined CSV.")
+    parser.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    parser.add_argument("--interval", type=float, default=CYCLE_INTERVAL,
+                        help="starting seconds between polls of each category (adapts within its bounds)")
+    parser.add_argument("--timeout", type=float, default=CATEGORY_TIMEOUT, help="per-category crawl deadline")
+    parser.add_argument("--categories", nargs="+", choices=CATEGORY_NAMES,
+                        help="only crawl these categories")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="store and score articles in batches at the end of the crawl")
+    args = parser.parse_args(argv)
+
+    streaming = STREAMING and not args.no_stream
+    if args.once:
+        run_cycle(args.categories, args.timeout, streaming=streaming)
+    else:
+        run_forever(args.interval, categories=args.categories, streaming=streaming)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,241 @@
 import os
-import pandas as pd
+import re
+import time
+import argparse
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+import numpy as np
 from textblob import TextBlob
 
-csv_files = [
-    "ndtv_general_news.csv",
-    "ndtv_cricket_news.csv",
-    "ndtv_education_news.csv",
-    "ndtv_health_news.csv",
-    "ndtv_entertainment_news.csv",
-    "ndtv_science_news.csv",
-    "ndtv_world_news.csv"
-]
+import storage
+
+# TextBlob is pure Python, so parallel scoring means processes; spawn keeps children clear of
+# the Flask/scraper threads in the parent
+SENTIMENT_WORKERS = int(os.environ.get("SENTIMENT_WORKERS", os.cpu_count() or 1))
+SENTIMENT_CHUNK_SIZE = int(os.environ.get("SENTIMENT_CHUNK_SIZE", "64"))
+SENTIMENT_BACKEND = os.environ.get("SENTIMENT_BACKEND", "textblob")
+
+def polarity_label(polarity):
+    if polarity > 0:
+        return "Positive"
+    elif polarity < 0:
+        return "Negative"
+    else:
+        return "Neutral"
 
 def get_sentiment(text):
     try:
         analysis = TextBlob(str(text))
-        polarity = analysis.sentiment.polarity
-        if polarity > 0:
-            return "Positive"
-        elif polarity < 0:
-            return "Negative"
-        else:
-            return "Neutral"
+        return polarity_label(analysis.sentiment.polarity)
     except Exception:
         return "Unknown"
 
-def analyze_sentiments_in_csv(csv_path):
-    if not os.path.exists(csv_path):
-        print(f"[ERROR] File not found: {csv_path}")
+# ---------------------------
+# Sentiment backends
+# ---------------------------
+class SentimentBackend:
+    """Turns a batch of texts into Positive/Negative/Neutral labels (Unknown on failure)."""
+
+    name = None
+
+    def score(self, texts):
+        raise NotImplementedError
+
+
+class TextBlobBackend(SentimentBackend):
+    name = "textblob"
+
+    def score(self, texts):
+        return [get_sentiment(text) for text in texts]
+
+
+class LexiconBackend(SentimentBackend):
+    """TextBlob's polarity lexicon, precompiled into arrays and applied to whole batches with NumPy.
+
+    Mirrors the pattern analyzer's rules for string input: the average polarity of known words,
+    an adverb modifier scaling the word after it, and a preceding negation flipping the
+    score by -0.5. Tokenization is a single regex instead of the full pattern tokenizer,
+    so a small share of labels can differ from TextBlob.
+    """
+
+    name = "lexicon"
+    TOKEN_RE = re.compile(r"[\w*]+(?:-[\w*]+)*")
+
+    def __init__(self):
+        from textblob.en import sentiment as lexicon
+
+        words = [w for w in lexicon if " " not in w]
+        negations = [w for w in lexicon.negations if w not in lexicon]
+        self.known_count = len(words)
+        self.vocab = {w: i for i, w in enumerate(words + negations)}
+        # one extra id stands for any other word long enough to break a negation or modifier
+        self.unknown_id = len(self.vocab)
+        extra = len(negations) + 1
+        scores = [lexicon[w][None] for w in words]
+        self.polarity = np.array([p for p, _, _ in scores] + [0.0] * extra)
+        self.intensity = np.array([i for _, _, i in scores] + [1.0] * extra)
+        self.modifier = np.array([any(pos in lexicon[w] for pos in lexicon.modifiers) for w in words] + [False] * extra)
+        self.negation = np.array([w in lexicon.negations for w in words + negations] + [False])
+
+    def _token_ids(self, text):
+        if not text:
+            return []
+        get, unknown = self.vocab.get, self.unknown_id
+        # single-letter unknowns are skipped, as the analyzer keeps a pending negation across them
+        return [get(t, unknown) for t in self.TOKEN_RE.findall(str(text).lower()) if len(t) > 1 or t in self.vocab]
+
+    def polarities(self, texts):
+        doc_ids = [self._token_ids(text) for text in texts]
+        n = len(doc_ids)
+        lengths = np.fromiter((len(ids) for ids in doc_ids), dtype=np.int64, count=n)
+        ids = np.fromiter(chain.from_iterable(doc_ids), dtype=np.int64, count=int(lengths.sum()))
+        if ids.size == 0:
+            return np.zeros(n)
+        doc = np.repeat(np.arange(n), lengths)
+
+        has_prev = np.r_[False, doc[1:] == doc[:-1]]
+        prev = np.r_[0, ids[:-1]]
+        known = ids < self.known_count
+        prev_known = has_prev & (prev < self.known_count)
+
+        p = self.polarity[ids].copy()
+        negated = known & has_prev & self.negation[prev]
+        # "very good": the modifier's own assessment is replaced by the scaled word after it
+        merged = np.flatnonzero(known & prev_known & self.modifier[prev])
+        p[merged] = np.clip(p[merged] * self.intensity[ids[merged - 1]], -1.0, 1.0)
+        negated[merged] |= negated[merged - 1]
+        assessed = known.copy()
+        assessed[merged - 1] = False
+
+        p = np.where(negated, p * -0.5, p)
+        sums = np.bincount(doc[assessed], weights=p[assessed], minlength=n)
+        counts = np.bincount(doc[assessed], minlength=n)
+        return sums / np.maximum(counts, 1)
+
+    def score(self, texts):
+        return [polarity_label(p) for p in self.polarities(list(texts))]
+
+
+BACKENDS = {backend.name: backend for backend in (TextBlobBackend, LexiconBackend)}
+_backend_instances = {}
+
+def get_backend(name=None):
+    name = name or SENTIMENT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{name}' (choose from {', '.join(BACKENDS)})")
+    if name not in _backend_instances:
+        _backend_instances[name] = BACKENDS[name]()
+    return _backend_instances[name]
+
+def _score_chunk(texts, backend=None):
+    return get_backend(backend).score(texts)
+
+def score_sentiments(texts, workers=None, chunk_size=None, backend=None):
+    """Labels for texts, in order, from the chosen backend; spread over a process pool when workers > 1."""
+    texts = list(texts)
+    backend = backend or SENTIMENT_BACKEND
+    workers = SENTIMENT_WORKERS if workers is None else workers
+    chunk_size = chunk_size or SENTIMENT_CHUNK_SIZE
+    if workers <= 1 or len(texts) <= chunk_size:
+        return _score_chunk(texts, backend)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    labels = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context) as pool:
+        for chunk_labels in pool.map(_score_chunk, chunks, repeat(backend)):
+            labels.extend(chunk_labels)
+    return labels
+
+def analyze_category_sentiments(category, full=False, workers=None, backend=None):
+    sentiment_analysis(full=full, workers=workers, categories=[category], backend=backend)
+
+def sentiment_analysis(full=False, workers=None, categories=None, chunk_size=None, backend=None):
+    # By default only rows without a label, or whose content changed since scoring, are (re)calculated.
+    # Rows from every category are scored in one batch so the pool is started once per pass.
+    pending = {}
+    for category in categories or storage.CATEGORIES:
+        try:
+            rows = storage.fetch_contents(category, unscored_only=not full)
+        except Exception as e:
+            print(f"[ERROR] Reading {category}: {str(e)}")
+            continue
+        if rows:
+            pending[category] = rows
+        else:
+            print(f"[SKIPPED] No {category} articles need scoring")
+    if not pending:
         return
 
+    texts = [content for rows in pending.values() for _, content, _ in rows]
     try:
-        df = pd.read_csv(csv_path)
+        labels = iter(score_sentiments(texts, workers=workers, chunk_size=chunk_size, backend=backend))
+    except Exception as e:
+        print(f"[ERROR] Scoring {len(texts)} articles: {str(e)}")
+        return
 
-        if 'content' not in df.columns:
-            print(f"[SKIPPED] No 'content' column in {csv_path}")
-            return
+    for category, rows in pending.items():
+        updates = [(next(labels), digest, rowid) for rowid, _, digest in rows]
+        try:
+            storage.update_sentiments(category, updates)
+            print(f"[UPDATED] Sentiment analysis saved for {len(rows)} {category} articles")
+        except Exception as e:
+            print(f"[ERROR] Processing {category}: {str(e)}")
 
-        # Always (re)calculate the sentiment results
-        df['analysis_result'] = df['content'].apply(get_sentiment)
+def stored_texts(limit=None):
+    texts = [content for category in storage.CATEGORIES for _, content, _ in storage.fetch_contents(category)]
+    return texts[:limit] if limit else texts
 
-        df.to_csv(csv_path, index=False, encoding='utf-8')
-        print(f"[UPDATED] Sentiment analysis saved to {csv_path}")
-    except Exception as e:
-        print(f"[ERROR] Processing {csv_path}: {str(e)}")
+def check_parallel_scoring(sample_size=500, workers=None, chunk_size=None, backend=None):
+    """Score a sample of stored articles serially and in parallel; returns the number of mismatched labels."""
+    texts = stored_texts(sample_size)
+    serial = _score_chunk(texts, backend)
+    parallel = score_sentiments(texts, workers=workers or max(2, SENTIMENT_WORKERS), chunk_size=chunk_size, backend=backend)
+    mismatches = sum(1 for a, b in zip(serial, parallel) if a != b) + abs(len(serial) - len(parallel))
+    print(f"[CHECK] {len(texts)} articles, {mismatches} label mismatches between serial and parallel scoring")
+    return mismatches
+
+def agreement_report(texts=None, baseline="textblob", candidate="lexicon"):
+    """Label agreement and single-process throughput of two backends on the same texts."""
+    texts = stored_texts() if texts is None else list(texts)
+    results = {}
+    for name in (baseline, candidate):
+        backend = get_backend(name)
+        started = time.perf_counter()
+        labels = backend.score(texts)
+        seconds = time.perf_counter() - started
+        results[name] = {"labels": labels, "seconds": seconds}
 
-def sentiment_analysis():
-    for csv_file in csv_files:
-        analyze_sentiments_in_csv(csv_file)
+    pairs = list(zip(results[baseline]["labels"], results[candidate]["labels"]))
+    agreed = sum(1 for a, b in pairs if a == b)
+    report = {
+        "articles": len(texts),
+        "agreement": round(agreed / len(pairs), 4) if pairs else 1.0,
+        "confusion": {f"{a}->{b}": count for (a, b), count in sorted(Counter(pairs).items())},
+    }
+    for name in (baseline, candidate):
+        seconds = results[name]["seconds"]
+        report[f"{name}_seconds"] = round(seconds, 3)
+        report[f"{name}_docs_per_sec"] = round(len(texts) / seconds, 1) if seconds else None
+    if results[candidate]["seconds"]:
+        report["speedup"] = round(results[baseline]["seconds"] / results[candidate]["seconds"], 1)
+    return report
 
 if __name__ == "__main__":
-    sentiment_analysis()
+    parser = argparse.ArgumentParser(description="Score article sentiment in the article store.")
+    parser.add_argument("--full", action="store_true", help="re-score every article, not just new or changed ones")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: SENTIMENT_WORKERS)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="articles per worker task")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=None, help="scoring backend (default: SENTIMENT_BACKEND)")
+    parser.add_argument("--check", action="store_true", help="compare parallel labels against the serial path and exit")
+    parser.add_argument("--compare", action="store_true", help="print a lexicon vs TextBlob agreement report and exit")
+    args = parser.parse_args()
+    if args.compare:
+        for key, value in agreement_report().items():
+            print(f"{key}: {value}")
+        raise SystemExit(0)
+    if args.check:
+        raise SystemExit(1 if check_parallel_scoring(workers=args.workers, chunk_size=args.chunk_size, backend=args.backend) else 0)
+    sentiment_analysis(full=args.full, workers=args.workers, chunk_size=args.chunk_size, backend=args.backend)
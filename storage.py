@@ -0,0 +1,649 @@
+# storage.py
+# Embedded SQLite article store shared by the scrapers, sentiment analysis and the API.
+import os
+import re
+import csv
+import hashlib
+import shutil
+import sqlite3
+import threading
+
+from categories import CATEGORY_REGISTRY
+from date_utils import LAYOUTS_VERSION, normalize_datetime, normalize_many
+
+DB_PATH = os.environ.get("NEWS_DB_PATH", "ndtv_news.db")
+
+# category -> legacy CSV file (imported once into the store on first use)
+CATEGORY_FILES = {name: config["csv"] for name, config in CATEGORY_REGISTRY.items() if config.get("csv")}
+CATEGORIES = list(CATEGORY_REGISTRY)
+
+ARTICLE_FIELDS = ["link", "headline", "datetime_posted", "content", "scraped_at", "analysis_result"]
+COMBINED_FIELDS = ["link", "headline", "datetime_posted", "content", "scraped_at", "category", "analysis_result"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    link TEXT NOT NULL,
+    category TEXT NOT NULL,
+    headline TEXT,
+    datetime_posted TEXT,
+    content TEXT,
+    scraped_at TEXT,
+    analysis_result TEXT NOT NULL DEFAULT '',
+    content_hash TEXT,
+    sentiment_hash TEXT,
+    published_at TEXT,
+    published_date TEXT,
+    changed_version INTEGER NOT NULL DEFAULT 0,
+    duplicate_of INTEGER,
+    category_duplicate INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (link, category)
+);
+CREATE INDEX IF NOT EXISTS idx_articles_category ON articles(category);
+CREATE INDEX IF NOT EXISTS idx_articles_posted ON articles(datetime_posted);
+CREATE INDEX IF NOT EXISTS idx_articles_sentiment ON articles(analysis_result);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS minhash_signatures (
+    article_rowid INTEGER PRIMARY KEY,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS minhash_bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    article_rowid INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, article_rowid)
+) WITHOUT ROWID;
+"""
+
+# ---------------------------
+# Daily sentiment aggregate, kept current by triggers on every insert/update/delete
+# ---------------------------
+SENTIMENTS = ("Positive", "Negative", "Neutral")
+# bump when the trigger definitions change; the aggregate is then rebuilt once
+AGGREGATE_VERSION = "3"
+
+def _bucket(row):
+    # missing/Unknown labels count as Neutral, as the trends page always has
+    return f"CASE WHEN {row}.analysis_result IN ('Positive', 'Negative') THEN {row}.analysis_result ELSE 'Neutral' END"
+
+# near-duplicates (see near_duplicates.py) are counted once: `articles` drops repeats within the
+# same category and serves per-category trends; `originals` also drops copies of a story first
+# stored under another section and serves the unfiltered trend
+def _counted(row):
+    return f"{row}.published_date IS NOT NULL AND {row}.category_duplicate = 0"
+
+def _original(row):
+    return f"({row}.duplicate_of IS NULL)"
+
+def _add_to_bucket(row, delta):
+    return f"""INSERT INTO sentiment_daily (day, category, sentiment, articles, originals)
+        SELECT {row}.published_date, {row}.category, {_bucket(row)}, {delta}, {delta} * {_original(row)}
+        WHERE {_counted(row)}
+        ON CONFLICT(day, category, sentiment) DO UPDATE
+        SET articles = articles + excluded.articles, originals = originals + excluded.originals;"""
+
+# dropped and recreated whenever AGGREGATE_VERSION changes
+SENTIMENT_DAILY_SCHEMA = """
+DROP TABLE IF EXISTS sentiment_daily;
+CREATE TABLE sentiment_daily (
+    day TEXT NOT NULL,
+    category TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    articles INTEGER NOT NULL DEFAULT 0,
+    originals INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, category, sentiment)
+);
+"""
+
+AGGREGATE_TRIGGERS = f"""
+DROP TRIGGER IF EXISTS trg_sentiment_daily_insert;
+DROP TRIGGER IF EXISTS trg_sentiment_daily_delete;
+DROP TRIGGER IF EXISTS trg_sentiment_daily_update;
+CREATE TRIGGER trg_sentiment_daily_insert AFTER INSERT ON articles BEGIN
+    {_add_to_bucket("NEW", 1)}
+END;
+CREATE TRIGGER trg_sentiment_daily_delete AFTER DELETE ON articles BEGIN
+    {_add_to_bucket("OLD", -1)}
+END;
+CREATE TRIGGER trg_sentiment_daily_update AFTER UPDATE OF analysis_result, published_date, category, duplicate_of, category_duplicate ON articles BEGIN
+    {_add_to_bucket("OLD", -1)}
+    {_add_to_bucket("NEW", 1)}
+END;
+"""
+
+# ---------------------------
+# Full-text search index (FTS5 over headline + content), kept current by triggers
+# ---------------------------
+# External-content table: the text lives only in `articles`; the index maps terms to articles.rowid.
+# Bump SEARCH_INDEX_VERSION when the table or tokenizer changes; the index is then rebuilt once.
+SEARCH_INDEX_VERSION = "1"
+
+SEARCH_SCHEMA = """
+DROP TRIGGER IF EXISTS trg_articles_fts_insert;
+DROP TRIGGER IF EXISTS trg_articles_fts_delete;
+DROP TRIGGER IF EXISTS trg_articles_fts_update;
+DROP TABLE IF EXISTS articles_fts;
+CREATE VIRTUAL TABLE articles_fts USING fts5(
+    headline, content,
+    content='articles', content_rowid='rowid',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER trg_articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, headline, content) VALUES (NEW.rowid, NEW.headline, NEW.content);
+END;
+CREATE TRIGGER trg_articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, headline, content) VALUES ('delete', OLD.rowid, OLD.headline, OLD.content);
+END;
+CREATE TRIGGER trg_articles_fts_update AFTER UPDATE OF headline, content ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, headline, content) VALUES ('delete', OLD.rowid, OLD.headline, OLD.content);
+    INSERT INTO articles_fts (rowid, headline, content) VALUES (NEW.rowid, NEW.headline, NEW.content);
+END;
+"""
+
+# headline matches weigh more than body matches in bm25()
+SEARCH_WEIGHTS = (5.0, 1.0)
+SEARCH_TERM_RE = re.compile(r"\w+\*?")
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_write_lock = threading.Lock()
+_initialized = set()
+
+# ---------------------------
+# Connections & schema
+# ---------------------------
+def get_connection():
+    # one connection per thread; scraper threads, the sentiment pass and Flask workers each get their own
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(DB_PATH)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conns[DB_PATH] = conn
+        _ensure_initialized(conn)
+    return conn
+
+def _ensure_initialized(conn):
+    with _init_lock:
+        if DB_PATH in _initialized:
+            return
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+        if get_meta("aggregate:sentiment_daily", conn=conn) != AGGREGATE_VERSION:
+            rebuild_sentiment_daily(conn)
+        if get_meta("index:articles_fts", conn=conn) != SEARCH_INDEX_VERSION:
+            rebuild_search_index(conn)
+        for category, filename in CATEGORY_FILES.items():
+            if get_meta(f"imported:{category}", conn=conn) is None:
+                import_csv(category, filename, conn=conn)
+        _initialized.add(DB_PATH)
+
+def _migrate(conn):
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(articles)")}
+    with conn:
+        if "content_hash" not in columns:
+            conn.execute("ALTER TABLE articles ADD COLUMN content_hash TEXT")
+        if "sentiment_hash" not in columns:
+            conn.execute("ALTER TABLE articles ADD COLUMN sentiment_hash TEXT")
+        # rows stored before hashing existed: hash them, and trust labels that are already there
+        missing = conn.execute("SELECT rowid, content FROM articles WHERE content_hash IS NULL").fetchall()
+        if missing:
+            conn.executemany(
+                "UPDATE articles SET content_hash = ? WHERE rowid = ?",
+                [(content_hash(row["content"]), row["rowid"]) for row in missing],
+            )
+            conn.execute(
+                "UPDATE articles SET sentiment_hash = content_hash "
+                "WHERE sentiment_hash IS NULL AND analysis_result != ''"
+            )
+        if "published_date" not in columns:
+            conn.execute("ALTER TABLE articles ADD COLUMN published_date TEXT")
+        if "published_at" not in columns:
+            conn.execute("ALTER TABLE articles ADD COLUMN published_at TEXT")
+        if get_meta("dates:layouts", conn=conn) != LAYOUTS_VERSION:
+            # canonical timestamps for rows stored before normalization, or before their layout was
+            # known; each distinct string is parsed once
+            rows = conn.execute("SELECT rowid, datetime_posted FROM articles WHERE published_at IS NULL").fetchall()
+            stamps = normalize_many(row["datetime_posted"] for row in rows)
+            conn.executemany(
+                "UPDATE articles SET published_at = ?, published_date = ? WHERE rowid = ?",
+                [(stamp, stamp[:10], row["rowid"]) for stamp, row in zip(stamps, rows) if stamp],
+            )
+            set_meta("dates:layouts", LAYOUTS_VERSION, conn=conn)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published_date)")
+        if "changed_version" not in columns:
+            conn.execute("ALTER TABLE articles ADD COLUMN changed_version INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_changed ON articles(changed_version)")
+        if "duplicate_of" not in columns:
+            # rowid of the earlier article this one is a near-duplicate of (NULL for originals)
+            conn.execute("ALTER TABLE articles ADD COLUMN duplicate_of INTEGER")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_duplicate ON articles(duplicate_of)")
+        if "category_duplicate" not in columns:
+            # 1 when an earlier article of the same cluster is in the same category
+            conn.execute("ALTER TABLE articles ADD COLUMN category_duplicate INTEGER NOT NULL DEFAULT 0")
+            conn.execute(CATEGORY_DUPLICATE_UPDATE.format(where="duplicate_of IS NOT NULL"))
+
+# flags rows whose near-duplicate cluster (root + everything pointing at it) has an earlier member in the same category
+CATEGORY_DUPLICATE_UPDATE = """
+UPDATE articles SET category_duplicate = 1
+WHERE {where} AND EXISTS (
+    SELECT 1 FROM articles AS earlier
+    WHERE earlier.category = articles.category AND earlier.rowid < articles.rowid
+      AND (earlier.rowid = articles.duplicate_of OR earlier.duplicate_of = articles.duplicate_of)
+)"""
+
+def rebuild_sentiment_daily(conn=None):
+    """Recount the aggregate from scratch and (re)install its triggers."""
+    conn = conn or get_connection()
+    with _write_lock:
+        conn.executescript("BEGIN;" + SENTIMENT_DAILY_SCHEMA + AGGREGATE_TRIGGERS + f"""
+            INSERT INTO sentiment_daily (day, category, sentiment, articles, originals)
+                SELECT published_date, category, {_bucket("articles")}, COUNT(*), SUM({_original("articles")})
+                FROM articles WHERE {_counted("articles")}
+                GROUP BY 1, 2, 3;
+            INSERT OR REPLACE INTO meta (key, value) VALUES ('aggregate:sentiment_daily', '{AGGREGATE_VERSION}');
+            COMMIT;""")
+
+def rebuild_search_index(conn=None):
+    """(Re)create the FTS table and its triggers, then index every stored article."""
+    conn = conn or get_connection()
+    with _write_lock:
+        conn.executescript("BEGIN;" + SEARCH_SCHEMA + f"""
+            INSERT INTO articles_fts (articles_fts) VALUES ('rebuild');
+            INSERT OR REPLACE INTO meta (key, value) VALUES ('index:articles_fts', '{SEARCH_INDEX_VERSION}');
+            COMMIT;""")
+
+
+def content_hash(content):
+    return hashlib.sha1((content or "").encode("utf-8")).hexdigest()
+
+def get_meta(key, default=None, conn=None):
+    conn = conn or get_connection()
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row["value"] if row else default
+
+def set_meta(key, value, conn=None):
+    conn = conn or get_connection()
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+def _bump_version(conn, category):
+    # every write bumps the category's counter and the combined one; readers compare these to cached copies
+    for key in (f"version:{category}", "version:*"):
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, 1) ON CONFLICT(key) DO UPDATE SET value = value + 1",
+            (key,),
+        )
+
+def _next_version(conn):
+    # the combined version this write will produce; rows it touches are stamped with it (callers hold _write_lock)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'version:*'").fetchone()
+    return (int(row["value"]) if row else 0) + 1
+
+def data_version(category=None):
+    """Monotonic counter that changes whenever the category (or, for None, any category) is written."""
+    return int(get_meta(f"version:{category or '*'}", 0))
+
+# ---------------------------
+# Writes
+# ---------------------------
+def import_csv(category, filename, conn=None):
+    """One-time migration of a legacy category CSV into the store."""
+    conn = conn or get_connection()
+    rows = []
+    if os.path.exists(filename):
+        try:
+            with open(filename, "r", encoding="utf-8") as file:
+                rows = [row for row in csv.DictReader(file) if row.get("link")]
+        except Exception as e:
+            print(f"[storage] error reading {filename}: {e}")
+            return 0
+    with _write_lock, conn:
+        inserted = _insert_rows(conn, category, rows)
+        set_meta(f"imported:{category}", len(rows), conn=conn)
+        _bump_version(conn, category)
+    if rows:
+        print(f"[storage] imported {inserted} articles from {filename}")
+    return inserted
+
+def _insert_rows(conn, category, rows):
+    # rowcount only counts the articles themselves, not rows touched by the aggregate triggers
+    version = _next_version(conn)
+    return conn.executemany(
+        """INSERT OR IGNORE INTO articles
+           (link, category, headline, datetime_posted, content, scraped_at, analysis_result,
+            content_hash, sentiment_hash, published_at, published_date, changed_version)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        [
+            (
+                row["link"],
+                category,
+                row.get("headline"),
+                row.get("datetime_posted"),
+                row.get("content"),
+                row.get("scraped_at"),
+                row.get("analysis_result") or "",
+                content_hash(row.get("content")),
+                # labels carried over from an import count as scored for this content
+                content_hash(row.get("content")) if row.get("analysis_result") else None,
+                *_published(row.get("datetime_posted")),
+                version,
+            )
+            for row in rows
+        ],
+    ).rowcount
+
+def _published(datetime_posted):
+    # (published_at, published_date): the canonical timestamp is worked out once, at write time
+    stamp = normalize_datetime(datetime_posted)
+    return stamp, stamp[:10] if stamp else None
+
+def normalize_row(category, row):
+    """Trimmed copy of a scraped row ready for the store, or None if it has no link.
+
+    Both the streamed and the batch write paths go through this, so an article's stored content
+    (and with it content_hash and its MinHash) doesn't depend on which one stored it.
+    """
+    link = (row.get("link") or "").strip()
+    if not link:
+        return None
+    normalized = {"link": link, "category": category}
+    for field in ("headline", "datetime_posted", "scraped_at"):
+        normalized[field] = " ".join(str(row.get(field) or "").split())
+    # paragraph breaks are kept; only runs of spaces and blank lines collapse
+    lines = (" ".join(line.split()) for line in str(row.get("content") or "").splitlines())
+    normalized["content"] = "\n".join(line for line in lines if line)
+    return normalized
+
+def insert_articles(category, rows):
+    """Insert scraped rows for a category; links already stored are ignored. Returns rows inserted."""
+    if not rows:
+        return 0
+    conn = get_connection()
+    with _write_lock, conn:
+        inserted = _insert_rows(conn, category, rows)
+        if inserted:
+            _bump_version(conn, category)
+        return inserted
+
+def update_sentiments(category, updates):
+    """updates: iterable of (analysis_result, scored content_hash, rowid) for rows of the given category."""
+    conn = get_connection()
+    with _write_lock, conn:
+        version = _next_version(conn)
+        conn.executemany(
+            "UPDATE articles SET analysis_result = ?, sentiment_hash = ?, changed_version = ? WHERE rowid = ?",
+            [(result, digest, version, rowid) for result, digest, rowid in updates],
+        )
+        _bump_version(conn, category)
+
+def save_minhashes(signatures, bands, duplicates, last_rowid):
+    """Persist one near-duplicate pass.
+
+    signatures: (rowid, signature blob); bands: (band, bucket, rowid); duplicates: (rowid, original rowid).
+    Marked duplicates are stamped as changed so the combined export and caches pick them up.
+    """
+    conn = get_connection()
+    with _write_lock, conn:
+        conn.executemany("INSERT OR REPLACE INTO minhash_signatures (article_rowid, signature) VALUES (?, ?)", signatures)
+        conn.executemany("INSERT OR IGNORE INTO minhash_bands (band, bucket, article_rowid) VALUES (?, ?, ?)", bands)
+        if duplicates:
+            version = _next_version(conn)
+            conn.executemany(
+                "UPDATE articles SET duplicate_of = ?, changed_version = ? WHERE rowid = ?",
+                [(original, version, rowid) for rowid, original in duplicates],
+            )
+            marked = [rowid for rowid, _ in duplicates]
+            conn.execute(
+                CATEGORY_DUPLICATE_UPDATE.format(where=f"rowid IN ({', '.join('?' * len(marked))})"), marked
+            )
+            categories = {row["category"] for row in conn.execute(
+                f"SELECT DISTINCT category FROM articles WHERE rowid IN ({', '.join('?' * len(marked))})", marked
+            )}
+            for category in categories:
+                _bump_version(conn, category)
+        set_meta("minhash:last_rowid", last_rowid, conn=conn)
+
+# ---------------------------
+# Reads
+# ---------------------------
+def get_links(category):
+    conn = get_connection()
+    return {row["link"] for row in conn.execute("SELECT link FROM articles WHERE category = ?", (category,))}
+
+def fetch_articles(category=None, with_dates=False):
+    """Rows in insertion order, shaped like the legacy CSV rows (plus category for the combined view).
+
+    The combined view leaves near-duplicates out, like ndtv_all_news.csv; a category's own
+    list keeps them. with_dates=True returns (rows, published dates) read in the same query.
+    """
+    conn = get_connection()
+    fields = COMBINED_FIELDS if category is None else ARTICLE_FIELDS
+    query = f"SELECT {', '.join(fields)}, published_date FROM articles"
+    if category is None:
+        cursor = conn.execute(query + " WHERE duplicate_of IS NULL ORDER BY rowid")
+    else:
+        cursor = conn.execute(query + " WHERE category = ? ORDER BY rowid", (category,))
+    rows, dates = [], []
+    for row in cursor:
+        rows.append({key: ("" if row[key] is None else row[key]) for key in fields})
+        dates.append(row["published_date"])
+    return (rows, dates) if with_dates else rows
+
+EXPORT_BATCH_SIZE = 500
+
+def _article_filters(categories=None, date=None, start=None, end=None, sentiments=None, table="articles"):
+    """WHERE clauses + params for the category / published date / sentiment filters the API offers."""
+    where, params = [], []
+    if categories:
+        where.append(f"{table}.category IN ({', '.join('?' * len(categories))})")
+        params.extend(categories)
+    if date:
+        where.append(f"{table}.published_date = ?")
+        params.append(date)
+    if start:
+        where.append(f"{table}.published_date >= ?")
+        params.append(start)
+    if end:
+        where.append(f"{table}.published_date <= ?")
+        params.append(end)
+    if sentiments:
+        where.append(f"lower({table}.analysis_result) IN ({', '.join('?' * len(sentiments))})")
+        params.extend(s.lower() for s in sentiments)
+    return where, params
+
+def iter_articles(categories=None, date=None, start=None, end=None, sentiments=None, batch_size=EXPORT_BATCH_SIZE):
+    """Yield combined-shape rows one at a time, filtered by category / published date / sentiment.
+
+    Near-duplicates are left out, as in the combined view. Reads in rowid-keyed batches, so
+    memory stays flat and no read transaction is held open between batches while the caller streams.
+    """
+    conn = get_connection()
+    where, params = _article_filters(categories, date, start, end, sentiments)
+    where.insert(0, "duplicate_of IS NULL")
+    query = (f"SELECT rowid, {', '.join(COMBINED_FIELDS)} FROM articles WHERE {' AND '.join(['rowid > ?', *where])} "
+             "ORDER BY rowid LIMIT ?")
+
+    last = 0
+    while True:
+        batch = conn.execute(query, [last, *params, batch_size]).fetchall()
+        for row in batch:
+            yield {key: ("" if row[key] is None else row[key]) for key in COMBINED_FIELDS}
+        if len(batch) < batch_size:
+            return
+        last = batch[-1]["rowid"]
+
+def fetch_contents(category, unscored_only=False):
+    """(rowid, content, content_hash) for a category; unscored_only skips rows whose label matches their content."""
+    conn = get_connection()
+    query = "SELECT rowid, content, content_hash FROM articles WHERE category = ?"
+    if unscored_only:
+        query += " AND (analysis_result = '' OR sentiment_hash IS NULL OR sentiment_hash != content_hash)"
+    return [(row["rowid"], row["content"], row["content_hash"]) for row in conn.execute(query + " ORDER BY rowid", (category,))]
+
+def search_query(text):
+    """User text -> FTS5 query: every word must match (a trailing * keeps prefix matching).
+
+    Words are quoted, so FTS operators and stray punctuation in the input can't cause syntax errors.
+    """
+    terms = []
+    for term in SEARCH_TERM_RE.findall(text or ""):
+        word, star = (term[:-1], "*") if term.endswith("*") else (term, "")
+        terms.append(f'"{word}"{star}')
+    return " ".join(terms)
+
+def search_articles(text, categories=None, date=None, start=None, end=None, sentiments=None, limit=20, offset=0):
+    """Best-ranked (bm25) articles matching text, with a highlighted snippet each.
+
+    Returns (hits, total matches before paging).
+    """
+    match = search_query(text)
+    if not match:
+        return [], 0
+    conn = get_connection()
+    where, params = _article_filters(categories, date, start, end, sentiments)
+    where_sql = " AND ".join(["articles_fts MATCH ?", *where])
+    joined = "FROM articles_fts JOIN articles ON articles.rowid = articles_fts.rowid"
+    total = conn.execute(f"SELECT COUNT(*) {joined} WHERE {where_sql}", [match, *params]).fetchone()[0]
+    rows = conn.execute(
+        f"""SELECT articles.link, articles.category, articles.headline, articles.datetime_posted,
+                   articles.published_at, articles.analysis_result,
+                   snippet(articles_fts, -1, '<mark>', '</mark>', '…', 24) AS snippet,
+                   bm25(articles_fts, {', '.join(map(str, SEARCH_WEIGHTS))}) AS score
+            {joined} WHERE {where_sql}
+            ORDER BY score LIMIT ? OFFSET ?""",
+        [match, *params, limit, offset],
+    ).fetchall()
+    hits = []
+    for row in rows:
+        hit = {key: ("" if row[key] is None else row[key]) for key in row.keys()}
+        # bm25 is lower-is-better; flip it so clients can read it as a relevance score
+        hit["score"] = round(-row["score"], 4)
+        hits.append(hit)
+    return hits, total
+
+def fetch_unhashed(limit=None):
+    """(rowid, content) for articles not yet through the near-duplicate pass, oldest first."""
+    conn = get_connection()
+    last = int(get_meta("minhash:last_rowid", 0, conn=conn))
+    query = "SELECT rowid, content FROM articles WHERE rowid > ? ORDER BY rowid"
+    params = [last]
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    return [(row["rowid"], row["content"]) for row in conn.execute(query, params)]
+
+def lsh_candidates(band_buckets):
+    """rowids sharing at least one (band, bucket) with the given keys; one indexed lookup per band."""
+    conn = get_connection()
+    found = set()
+    for band, bucket in band_buckets:
+        found.update(row[0] for row in conn.execute(
+            "SELECT article_rowid FROM minhash_bands WHERE band = ? AND bucket = ?", (band, bucket)
+        ))
+    return found
+
+def get_minhashes(rowids):
+    """{rowid: (signature blob, duplicate_of)} for already-processed articles."""
+    rowids = list(rowids)
+    if not rowids:
+        return {}
+    conn = get_connection()
+    rows = conn.execute(
+        f"""SELECT s.article_rowid, s.signature, a.duplicate_of FROM minhash_signatures s
+            JOIN articles a ON a.rowid = s.article_rowid
+            WHERE s.article_rowid IN ({', '.join('?' * len(rowids))})""",
+        rowids,
+    )
+    return {row[0]: (row[1], row[2]) for row in rows}
+
+def sentiment_trends(categories=None, start=None, end=None):
+    """{day: {"Positive": n, "Negative": n, "Neutral": n}} from the precomputed daily aggregate.
+
+    A story repeated across sections counts once in every section's trend, but only once overall.
+    """
+    conn = get_connection()
+    column = "articles" if categories else "originals"
+    query = f"SELECT day, sentiment, SUM({column}) AS articles FROM sentiment_daily WHERE {column} > 0"
+    params = []
+    if categories:
+        query += f" AND category IN ({', '.join('?' * len(categories))})"
+        params.extend(categories)
+    if start:
+        query += " AND day >= ?"
+        params.append(start)
+    if end:
+        query += " AND day <= ?"
+        params.append(end)
+    trends = {}
+    for row in conn.execute(query + " GROUP BY day, sentiment ORDER BY day", params):
+        trends.setdefault(row["day"], dict.fromkeys(SENTIMENTS, 0))[row["sentiment"]] = row["articles"]
+    return trends
+
+def _write_csv(path, fieldnames, rows, mode="w"):
+    with open(path, mode, newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        if mode == "w":
+            writer.writeheader()
+        writer.writerows(rows)
+
+def _combined_rows(conn, where="", params=()):
+    cursor = conn.execute(
+        f"SELECT rowid, duplicate_of, {', '.join(COMBINED_FIELDS)} FROM articles {where} ORDER BY rowid", params
+    )
+    return [
+        (row["rowid"], row["duplicate_of"] is not None, {key: ("" if row[key] is None else row[key]) for key in COMBINED_FIELDS})
+        for row in cursor
+    ]
+
+def export_csv(filename, category=None):
+    """Full export of one category (or the combined view), written to a temp file and renamed into place."""
+    rows = fetch_articles(category)
+    tmp = f"{filename}.tmp"
+    _write_csv(tmp, ARTICLE_FIELDS if category else COMBINED_FIELDS, rows)
+    os.replace(tmp, filename)
+    return len(rows)
+
+def export_combined_csv(filename):
+    """Bring the combined CSV up to date with the store. Returns (mode, rows written).
+
+    Rows added since the last export are appended; a full rewrite only happens on the first
+    export or when an already-exported row changed (e.g. it was re-scored or marked as a
+    near-duplicate). Near-duplicates are left out. Either way the result is swapped in with
+    an atomic rename, so readers never see a half-written file.
+    """
+    conn = get_connection()
+    state_key = f"export:{os.path.abspath(filename)}"
+    state = get_meta(state_key)
+    current = data_version()
+    last_version, last_rowid = map(int, state.split(":")) if state else (None, 0)
+
+    tmp = f"{filename}.tmp"
+    if last_version is not None and os.path.exists(filename):
+        changed = _combined_rows(
+            conn, "WHERE changed_version > ? AND changed_version <= ?", (last_version, current)
+        )
+        if not changed:
+            return "unchanged", 0
+        if all(rowid > last_rowid for rowid, _, _ in changed):
+            fresh = [row for _, duplicate, row in changed if not duplicate]
+            if fresh:
+                shutil.copyfile(filename, tmp)
+                _write_csv(tmp, COMBINED_FIELDS, fresh, mode="a")
+                os.replace(tmp, filename)
+            with conn:
+                set_meta(state_key, f"{current}:{changed[-1][0]}", conn=conn)
+            return ("appended", len(fresh)) if fresh else ("unchanged", 0)
+
+    rows = _combined_rows(conn, "WHERE changed_version <= ?", (current,))
+    kept = [row for _, duplicate, row in rows if not duplicate]
+    _write_csv(tmp, COMBINED_FIELDS, kept)
+    os.replace(tmp, filename)
+    with conn:
+        set_meta(state_key, f"{current}:{rows[-1][0] if rows else 0}", conn=conn)
+    return "rewritten", len(kept)
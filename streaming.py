@@ -0,0 +1,225 @@
+# streaming.py
+# Incremental path for freshly scraped articles: each row flows through bounded in-process queues
+#   normalize -> score sentiment -> store -> publish to the API cache
+# as soon as its page is parsed, instead of waiting for the whole cycle to finish. Full queues
+# block the stage feeding them, so a slow store or scorer throttles the crawl rather than
+# piling rows up in memory. The batch passes in pipeline.run_cycle still run afterwards and
+# pick up anything the stream missed.
+import os
+import queue
+import threading
+import time
+
+import storage
+from api_cache import ARTICLE_CACHE
+from metrics import ROWS_WRITTEN, SCRAPE_STAGE, STREAM_FRESHNESS, STREAM_ITEMS, STREAM_QUEUE_DEPTH
+from sentiment_analysis import SENTIMENT_BACKEND, get_backend
+
+STREAM_QUEUE_SIZE = int(os.environ.get("STREAM_QUEUE_SIZE", "256"))
+# the scorer and the store take whatever is queued, up to this many rows, per round
+STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE", "32"))
+# touched categories are republished at most this often (seconds)
+STREAM_PUBLISH_INTERVAL = float(os.environ.get("STREAM_PUBLISH_INTERVAL", "1.0"))
+
+_STOP = object()
+
+
+def publish_to_cache(categories):
+    # rebuild the touched lists (and the combined one) with their compressed bodies before the next request
+    ARTICLE_CACHE.warm(sorted(categories))
+
+
+class ArticleStream:
+    """Runs the stages on one thread each; submit() feeds it from any number of scrape threads.
+
+    on_store(category, links) is called after each successful insert (used to update the
+    crawler's seen-link index); publish(categories), if given, after new rows become readable.
+    """
+
+    def __init__(self, backend=None, publish=None, on_store=None,
+                 queue_size=STREAM_QUEUE_SIZE, batch_size=STREAM_BATCH_SIZE,
+                 publish_interval=STREAM_PUBLISH_INTERVAL):
+        self.backend = backend or SENTIMENT_BACKEND
+        self.publish = publish
+        self.on_store = on_store
+        self.batch_size = max(1, batch_size)
+        self.publish_interval = publish_interval
+        self.queues = {stage: queue.Queue(maxsize=queue_size) for stage in ("normalize", "score", "store", "publish")}
+        self.stats = {"submitted": 0, "normalized": 0, "scored": 0, "stored": 0, "published": 0, "dropped": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+        self._threads = []
+
+    # ---------------------------
+    # Feeding and lifecycle
+    # ---------------------------
+    def start(self):
+        if not self._threads:
+            for stage, target in (("normalize", self._normalize), ("score", self._score),
+                                  ("store", self._store), ("publish", self._publish)):
+                thread = threading.Thread(target=target, name=f"stream-{stage}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def submit(self, category, row):
+        """Queue one scraped row; blocks while the stream is full."""
+        self._count("submitted")
+        self._put("normalize", (category, row, time.monotonic()))
+
+    def flush(self):
+        """Block until everything submitted so far has been stored and published."""
+        for stage in ("normalize", "score", "store", "publish"):
+            self.queues[stage].join()
+
+    def stop(self):
+        self.flush()
+        self._put("normalize", _STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def status(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["queues"] = {stage: q.qsize() for stage, q in self.queues.items()}
+        stats["running"] = bool(self._threads)
+        return stats
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+        STREAM_ITEMS.inc(n, stage=key)
+
+    def _put(self, stage, item):
+        self.queues[stage].put(item)
+        STREAM_QUEUE_DEPTH.set(self.queues[stage].qsize(), stage=stage)
+
+    def _take(self, stage):
+        """Wait for one item, then take whatever else is already queued (up to batch_size)."""
+        q = self.queues[stage]
+        items = [q.get()]
+        while len(items) < self.batch_size and items[-1] is not _STOP:
+            try:
+                items.append(q.get_nowait())
+            except queue.Empty:
+                break
+        STREAM_QUEUE_DEPTH.set(q.qsize(), stage=stage)
+        return items
+
+    def _done(self, stage, items):
+        for _ in items:
+            self.queues[stage].task_done()
+
+    # ---------------------------
+    # Stages
+    # ---------------------------
+    def _normalize(self):
+        while True:
+            item = self.queues["normalize"].get()
+            try:
+                if item is _STOP:
+                    self._put("score", _STOP)
+                    return
+                category, row, submitted = item
+                normalized = storage.normalize_row(category, row)
+                if normalized is None:
+                    self._count("dropped")
+                    continue
+                self._count("normalized")
+                self._put("score", (normalized, submitted))
+            finally:
+                self.queues["normalize"].task_done()
+
+    def _score(self):
+        while True:
+            items = self._take("score")
+            stop = items[-1] is _STOP
+            batch = items[:-1] if stop else items
+            try:
+                if batch:
+                    try:
+                        labels = get_backend(self.backend).score([row["content"] for row, _ in batch])
+                    except Exception as e:
+                        # leave them unscored; the cycle's sentiment pass retries
+                        print(f"[stream] scoring {len(batch)} articles failed: {e}")
+                        self._count("errors")
+                        labels = [""] * len(batch)
+                    for (row, _), label in zip(batch, labels):
+                        row["analysis_result"] = label
+                    self._count("scored", len(batch))
+                    for item in batch:
+                        self._put("store", item)
+                if stop:
+                    self._put("store", _STOP)
+                    return
+            finally:
+                self._done("score", items)
+
+    def _store(self):
+        while True:
+            items = self._take("store")
+            stop = items[-1] is _STOP
+            batch = items[:-1] if stop else items
+            try:
+                by_category = {}
+                for row, submitted in batch:
+                    by_category.setdefault(row["category"], []).append((row, submitted))
+                for category, entries in by_category.items():
+                    rows = [row for row, _ in entries]
+                    try:
+                        with SCRAPE_STAGE.time(category=category, stage="store"):
+                            inserted = storage.insert_articles(category, rows)
+                    except Exception as e:
+                        # not added to the seen-link index either, so the next crawl picks them up again
+                        print(f"[stream] storing {len(rows)} {category} articles failed: {e}")
+                        self._count("errors")
+                        continue
+                    if self.on_store is not None:
+                        self.on_store(category, [row["link"] for row in rows])
+                    ROWS_WRITTEN.inc(inserted, category=category)
+                    self._count("stored", inserted)
+                    if inserted:
+                        self._put("publish", (category, [submitted for _, submitted in entries]))
+                if stop:
+                    self._put("publish", _STOP)
+                    return
+            finally:
+                self._done("store", items)
+
+    def _publish(self):
+        waiting, deadline = [], None
+        while True:
+            item = None
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is None or remaining > 0:
+                try:
+                    item = self.queues["publish"].get(timeout=remaining)
+                except queue.Empty:
+                    pass
+            if item is not None and item is not _STOP:
+                # coalesce stores that land close together into one cache rebuild
+                waiting.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.publish_interval
+                continue
+            if waiting:
+                self._publish_batch(waiting)
+                waiting, deadline = [], None
+            if item is _STOP:
+                self.queues["publish"].task_done()
+                return
+
+    def _publish_batch(self, waiting):
+        categories = {category for category, _ in waiting}
+        try:
+            if self.publish is not None:
+                self.publish(categories)
+        except Exception as e:
+            print(f"[stream] publishing {sorted(categories)} failed: {e}")
+            self._count("errors")
+        now = time.monotonic()
+        for _, stamps in waiting:
+            for submitted in stamps:
+                STREAM_FRESHNESS.observe(now - submitted)
+            self._count("published", len(stamps))
+            self.queues["publish"].task_done()